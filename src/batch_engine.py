@@ -0,0 +1,382 @@
+# NumPy is an optional extra, the same as for engine.GameState(use_numpy=True); the game itself does not need it
+import numpy as np
+
+import engine
+
+
+
+class BatchGameState():
+    '''Steps many games of the same size in lockstep; every board follows exactly the rules of engine.GameState.
+
+    Boards live in one (boards, cols, rows) array of jewel codes and one of cell states. Every action takes an
+    optional boolean mask of the boards to act on; boards whose game is over are always left alone. Instead of
+    raising IllegalAction, actions return a boolean array telling which boards the action was legal on.
+    '''
+    def __init__(self, boards: int, rows: int, columns: int) -> None:
+        if rows < 4:
+            raise engine.InvalidBoardRows(f'Board must have at least 4 rows, but {rows} were provided.')
+        if columns < 3:
+            raise engine.InvalidBoardColumns(f'Board must have at least 3 columns, but {columns} were provided.')
+
+        self._boards = boards
+        self._rows = rows
+        self._columns = columns
+
+        shape = (boards, columns, rows)
+        self._jewels = np.zeros(shape, dtype=np.uint8)
+        self._states = np.zeros(shape, dtype=np.uint8)
+
+        # one faller per board; its coordinates are (col, bottom_row - 2 .. bottom_row) like engine.Faller
+        self._faller = np.zeros(boards, dtype=bool)
+        self._faller_col = np.zeros(boards, dtype=np.intp)
+        self._faller_bottom = np.zeros(boards, dtype=np.intp)
+        self._faller_state = np.zeros(boards, dtype=np.uint8)
+        self._faller_codes = np.zeros((boards, 3), dtype=np.uint8)
+
+        # where each faller was last drawn; a new faller has not been drawn yet
+        self._prev_drawn = np.zeros(boards, dtype=bool)
+        self._prev_col = np.zeros(boards, dtype=np.intp)
+        self._prev_bottom = np.zeros(boards, dtype=np.intp)
+
+        self._matches = np.zeros(shape, dtype=bool)
+        self._matches_count = np.zeros(boards, dtype=np.int64)
+        self._has_match = np.zeros(boards, dtype=bool)
+
+        self._turn_num = np.ones(boards, dtype=np.int64)
+        self._total_points = np.zeros(boards, dtype=np.int64)
+        self._current_points = np.zeros(boards, dtype=np.int64)
+
+        self._game_over = np.zeros(boards, dtype=bool)
+
+    def boards(self) -> int:
+        return self._boards
+
+    def rows(self) -> int:
+        return self._rows
+
+    def columns(self) -> int:
+        return self._columns
+
+    def jewels(self) -> np.ndarray:
+        '''Returns the (boards, cols, rows) array of jewel codes; 0 is an empty cell'''
+        return self._jewels
+
+    def states(self) -> np.ndarray:
+        return self._states
+
+    def board(self, k: int) -> list[list[engine.Cell]]:
+        '''Returns board k as a row-major 2D list of Cells, like engine.GameState.board()'''
+        jewels = self._jewels[k].T.tolist()
+        states = self._states[k].T.tolist()
+        return [[engine.Cell(s, engine.code_jewel(j)) for s, j in zip(state_row, jewel_row)] for state_row, jewel_row in zip(states, jewels)]
+
+    def has_faller(self) -> np.ndarray:
+        return self._faller
+
+    def faller_col(self) -> np.ndarray:
+        return self._faller_col
+
+    def faller_bottom_row(self) -> np.ndarray:
+        return self._faller_bottom
+
+    def faller_state(self) -> np.ndarray:
+        return self._faller_state
+
+    def has_match(self) -> np.ndarray:
+        return self._has_match
+
+    def current_points(self) -> np.ndarray:
+        return self._current_points
+
+    def total_points(self) -> np.ndarray:
+        return self._total_points
+
+    def game_over(self) -> np.ndarray:
+        return self._game_over
+
+    def end(self, mask: np.ndarray = None) -> None:
+        '''Force the selected games into game over state'''
+        self._game_over |= self._select(mask)
+
+    def load(self, k: int, data: list[str]) -> None:
+        '''Loads initial field data into board k, apply gravity, and mark any initial matches'''
+        rows = self._rows
+        columns = self._columns
+
+        if len(data) != rows:
+            raise engine.InvalidInitialFieldDimensions(f'Expected {rows} rows, got {len(data)}')
+        for r, line in enumerate(data):
+            if len(line) != columns:
+                raise engine.InvalidInitialFieldDimensions(f'Row {r + 1} expected {columns} columns, got {len(line)}')
+
+        codes = [[0 if jewel == ' ' else engine.jewel_code(jewel) for jewel in line] for line in data]
+        self._jewels[k] = np.array(codes, dtype=np.uint8).T
+        self._states[k] = np.where(self._jewels[k] != 0, 3, 0)
+
+        idx = np.array([k])
+        self._apply_gravity(idx)
+        self._find_and_mark_matches(idx)
+
+    def spawn_faller(self, cols: np.ndarray, jewels: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        '''Spawns a faller on each selected board in the given 1-based column with the given (boards, 3) jewel codes;
+        columns outside the board are illegal, like in engine.GameState.try_spawn_faller'''
+        sel = self._select(mask)
+        cols = np.asarray(cols, dtype=np.intp) - 1
+
+        legal = sel & (cols >= 0) & (cols < self._columns) & ~self._faller & ~self._has_match
+
+        # a full spawn column ends the game, like spawn_faller raising after setting game over
+        full = np.zeros(self._boards, dtype=bool)
+        idx = np.flatnonzero(legal)
+        full[idx] = self._jewels[idx, cols[idx], 0] != 0
+        self._game_over |= full
+        legal &= ~full
+
+        idx = np.flatnonzero(legal)
+        self._faller[idx] = True
+        self._faller_col[idx] = cols[idx]
+        self._faller_bottom[idx] = 0
+        self._faller_state[idx] = 1
+        self._faller_codes[idx] = np.asarray(jewels, dtype=np.uint8)[idx]
+        self._prev_drawn[idx] = False
+
+        self._update_faller_state(idx)
+        self._update_board(idx)
+
+        self._total_points[idx] += self._current_points[idx]
+        self._current_points[idx] = 0
+        self._turn_num[idx] = 1
+
+        return legal
+
+    def rotate_faller(self, mask: np.ndarray = None) -> np.ndarray:
+        '''Rotates every selected active, unfrozen faller'''
+        legal = self._select(mask) & self._faller & (self._faller_state != 3)
+        idx = np.flatnonzero(legal)
+
+        self._faller_codes[idx] = self._faller_codes[idx][:, [2, 0, 1]]
+        self._update_board(idx)
+
+        return legal
+
+    def move_faller_left(self, mask: np.ndarray = None) -> np.ndarray:
+        return self._move_faller(self._select(mask), -1)
+
+    def move_faller_right(self, mask: np.ndarray = None) -> np.ndarray:
+        return self._move_faller(self._select(mask), 1)
+
+    def _move_faller(self, sel: np.ndarray, step: int) -> np.ndarray:
+        '''Moves every selected faller one column by step where the column next to it is free'''
+        edge = 0 if step < 0 else self._columns - 1
+        legal = sel & self._faller & (self._faller_col != edge) & (self._faller_state != 3)
+
+        idx = np.flatnonzero(legal)
+        target = self._faller_col[idx] + step
+        for j in range(3):
+            r = self._faller_bottom[idx] - 2 + j
+            on = r >= 0
+            blocked = np.zeros(len(idx), dtype=bool)
+            blocked[on] = self._jewels[idx[on], target[on], r[on]] != 0
+            legal[idx[blocked]] = False
+
+        idx = np.flatnonzero(legal)
+        self._faller_col[idx] += step
+        self._faller_state[idx] = 1
+
+        self._update_faller_state(idx)
+        self._update_board(idx)
+
+        return legal
+
+    def tick(self, mask: np.ndarray = None) -> None:
+        '''Advances every selected game one step, exactly like engine.GameState.tick()'''
+        sel = self._select(mask)
+
+        clearing = np.flatnonzero(sel & self._has_match)
+        falling = np.flatnonzero(sel & ~self._has_match & self._faller)
+
+        if len(clearing):
+            self._tick_clearing(clearing)
+        if len(falling):
+            self._tick_falling(falling)
+
+    def _tick_clearing(self, idx: np.ndarray) -> None:
+        '''Clears the matches on the given boards, scores them, and lets the rest of the board fall'''
+        matches = self._matches[idx]
+        jewels = self._jewels[idx]
+        states = self._states[idx]
+        jewels[matches] = 0
+        states[matches] = 0
+        self._jewels[idx] = jewels
+        self._states[idx] = states
+        self._has_match[idx] = False
+
+        self._current_points[idx] += (1 << self._turn_num[idx]) * 100 * self._matches_count[idx]
+        self._turn_num[idx] += 1
+
+        with_faller = idx[self._faller[idx]]
+        offboard = with_faller[self._faller_bottom[with_faller] < 2]
+        self._faller[with_faller[self._faller_bottom[with_faller] >= 2]] = False
+
+        # frozen jewels still above the board are rare, so they are resolved one board at a time
+        for k in offboard:
+            self._resolve_offboard_frozen_jewels(k)
+
+        self._apply_gravity(idx)
+        self._find_and_mark_matches(idx)
+
+        self._game_over[idx[self._has_match[idx]]] = False
+        self._faller[idx[~self._has_match[idx]]] = False
+
+    def _tick_falling(self, idx: np.ndarray) -> None:
+        '''Moves the given fallers down a row, and freezes and checks for matches where they have landed'''
+        # updates state before movement to detect landing on spawn
+        self._update_faller_state(idx)
+
+        moving = idx[self._faller_state[idx] == 1]
+        self._faller_bottom[moving] += 1
+        self._update_faller_state(moving)
+
+        self._update_board(idx)
+
+        frozen = idx[self._faller_state[idx] == 3]
+        if len(frozen) == 0:
+            return
+
+        self._find_and_mark_matches(frozen)
+
+        # without matches a faller still sticking out above the board ends the game
+        settled = frozen[~self._has_match[frozen]]
+        self._game_over[settled[self._faller_bottom[settled] < 2]] = True
+        self._faller[settled] = False
+
+    def _resolve_offboard_frozen_jewels(self, k: int) -> None:
+        '''Places board k's offboard faller jewels into its column, moves the faller down, or triggers game over'''
+        rows = self._rows
+        col = self._faller_col[k]
+        bottom = self._faller_bottom[k]
+        state = self._faller_state[k]
+
+        offboard = [(int(code), int(state)) for code in self._faller_codes[k, :2 - bottom]]
+        combined = offboard + list(zip(self._jewels[k, col].tolist(), self._states[k, col].tolist()))
+        stack = [cell for cell in combined if cell[0]]
+
+        self._faller_bottom[k] += len(combined) - len(stack)
+
+        # if there are more jewels than rows, game over
+        if len(stack) > rows:
+            self._game_over[k] = True
+            stack = stack[len(stack) - rows:]
+
+        empties = rows - len(stack)
+        self._jewels[k, col] = [0] * empties + [jewel for jewel, _ in stack]
+        self._states[k, col] = [0] * empties + [state for _, state in stack]
+
+    def _apply_gravity(self, idx: np.ndarray) -> None:
+        '''Packs the jewels of every column on the given boards to the bottom, keeping their order'''
+        rows = self._rows
+        jewels = self._jewels[idx]
+        states = self._states[idx]
+
+        occupied = jewels != 0
+        # every jewel lands above the jewels that are below it in its column
+        below = np.cumsum(occupied[..., ::-1], axis=2)[..., ::-1]
+        k, c, r = np.nonzero(occupied)
+        target = rows - below[k, c, r]
+
+        packed_jewels = np.zeros_like(jewels)
+        packed_states = np.zeros_like(states)
+        packed_jewels[k, c, target] = jewels[k, c, r]
+        packed_states[k, c, target] = states[k, c, r]
+
+        self._jewels[idx] = packed_jewels
+        self._states[idx] = packed_states
+
+    def _find_and_mark_matches(self, idx: np.ndarray) -> None:
+        '''Finds all runs of 3+ on the given boards, counts them like engine.GameState, and marks them'''
+        board = self._jewels[idx]
+        matches = np.zeros(board.shape, dtype=bool)
+        count = np.zeros(len(idx), dtype=np.int64)
+
+        # the (cols, rows) slices of the first, second and third jewel of every window of 3 in each direction
+        head, mid, tail, full = slice(None, -2), slice(1, -1), slice(2, None), slice(None)
+        directions = [
+            ((head, full), (mid, full), (tail, full)), # horizontal
+            ((full, head), (full, mid), (full, tail)), # vertical
+            ((head, head), (mid, mid), (tail, tail)),  # diagonal down-right
+            ((head, tail), (mid, mid), (tail, head))   # diagonal up-right
+        ]
+
+        for first, second, third in directions:
+            first, second, third = (..., *first), (..., *second), (..., *third)
+            a, b, c = board[first], board[second], board[third]
+            windows = (a != 0) & (a == b) & (b == c)
+
+            count += np.count_nonzero(windows, axis=(1, 2))
+
+            matches[first] |= windows
+            matches[second] |= windows
+            matches[third] |= windows
+
+        self._matches[idx] = matches
+        self._matches_count[idx] = count
+        self._has_match[idx] = count > 0
+
+        states = self._states[idx]
+        states[matches] = 4
+        self._states[idx] = states
+
+    def _update_board(self, idx: np.ndarray) -> None:
+        '''Redraws the given boards' fallers and clears their previous positions'''
+        rows = self._rows
+
+        drawn = idx[self._prev_drawn[idx]]
+        for j in range(3):
+            r = self._prev_bottom[drawn] - 2 + j
+            on = drawn[r >= 0]
+            c, r = self._prev_col[on], r[r >= 0]
+            stale = (self._states[on, c, r] == 1) | (self._states[on, c, r] == 2)
+            self._jewels[on[stale], c[stale], r[stale]] = 0
+            self._states[on[stale], c[stale], r[stale]] = 0
+
+        self._prev_drawn[idx] = True
+        self._prev_col[idx] = self._faller_col[idx]
+        self._prev_bottom[idx] = self._faller_bottom[idx]
+
+        for j in range(3):
+            r = self._faller_bottom[idx] - 2 + j
+            on = idx[r >= 0]
+            r = r[r >= 0]
+            self._jewels[on, self._faller_col[on], r] = self._faller_codes[on, j]
+            self._states[on, self._faller_col[on], r] = self._faller_state[on]
+
+    def _update_faller_state(self, idx: np.ndarray) -> None:
+        '''Moves the given fallers through falling -> landed -> frozen based on what is below them'''
+        state = self._faller_state[idx]
+        landed = self._is_faller_landed(idx)
+
+        state = np.where((state == 1) & landed, 2, state)
+        state = np.where((self._faller_state[idx] == 2) & landed, 3, state)
+        state = np.where((self._faller_state[idx] == 2) & ~landed, 1, state)
+        self._faller_state[idx] = state
+
+    def _is_faller_landed(self, idx: np.ndarray) -> np.ndarray:
+        '''Returns which of the given fallers rest on the board bottom or another jewel'''
+        bottom = self._faller_bottom[idx]
+        landed = bottom == self._rows - 1
+
+        above = ~landed
+        landed[above] = self._jewels[idx[above], self._faller_col[idx[above]], bottom[above] + 1] != 0
+        return landed
+
+    def _select(self, mask: np.ndarray | None) -> np.ndarray:
+        '''Returns the boards an action applies to: the mask, if any, minus the games that are over'''
+        if mask is None:
+            return ~self._game_over
+        return np.asarray(mask, dtype=bool) & ~self._game_over
+
+
+
+def jewel_codes(jewels: list[list[str]]) -> np.ndarray:
+    '''Converts per-board faller jewels such as [['R', 'G', 'B'], ...] into a (boards, 3) array of codes'''
+    return np.array([[engine.jewel_code(jewel) for jewel in faller] for faller in jewels], dtype=np.uint8)
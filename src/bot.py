@@ -0,0 +1,186 @@
+import time
+from dataclasses import dataclass
+
+import engine
+
+# time a decision may take by default; leaves room inside one 33 ms frame at 30 FPS
+DEFAULT_TIME_BUDGET = 0.02
+
+# a placement that ends the game is worse than anything else
+GAME_OVER_SCORE = float('-inf')
+
+# how much the board shape weighs against points when scoring a settled board
+HEIGHT_WEIGHT = 20
+BUMPINESS_WEIGHT = 10
+DANGER_WEIGHT = 500
+PAIR_WEIGHT = 15
+
+
+
+@dataclass
+class Plan:
+    actions: list[str]          # shell protocol actions: 'R', '<' and '>', applied before the faller drops
+    col: int                    # 1-based column the faller lands in
+    rotations: int
+    score: float
+    lookahead: bool = False     # True if the score includes the best placement of the next faller
+    evaluated: int = 0          # settled boards scored while searching
+
+
+
+class PlacementBot():
+    '''Picks where to drop the current faller by simulating every reachable placement and the cascade it causes.
+
+    Placements are searched one faller deep first, then the best ones are searched again with the next faller
+    while time is left. Settled boards are deduplicated through a transposition table keyed by
+    GameState.board_hash(), so placements that end in the same board are only searched once.
+
+    The deeper search stops at the time budget, or after max_evaluations scored boards if that is given; with
+    time_budget=None only the evaluation limit applies, and the same game always gets the same plan.
+    '''
+    def __init__(self, time_budget: float | None = DEFAULT_TIME_BUDGET, max_evaluations: int = None) -> None:
+        self._time_budget = time_budget
+        self._max_evaluations = max_evaluations
+        self._table = {}
+        self._evaluated = 0
+
+    def choose(self, game: engine.GameState, faller: engine.Faller = None, next_faller: engine.Faller = None) -> Plan | None:
+        '''Returns the best plan for the game's active faller, or for faller if it has not been spawned yet;
+        returns None if the faller cannot be placed at all'''
+        deadline = None if self._time_budget is None else time.perf_counter() + self._time_budget
+        self._table.clear()
+        self._evaluated = 0
+
+        root = game
+        if game.faller() is None:
+            if faller is None:
+                raise engine.IllegalAction('No active faller and no faller to spawn.')
+            root = game.clone()
+            if not root.try_spawn_faller(faller.clone()):
+                return None
+
+        # (plan, settled state, points scored by the drop) for every reachable placement
+        candidates = []
+        for actions, rotations, state in self._placements(root):
+            points = self._drop(state)
+            if state.game_over():
+                value = GAME_OVER_SCORE
+            else:
+                value = points + self._settled_value(state, None, deadline)
+
+            col = root.faller().col() + 1 + actions.count('>') - actions.count('<')
+            candidates.append((Plan(actions, col, rotations, value), state, points))
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=lambda candidate: candidate[0].score, reverse=True)
+        plans = [plan for plan, _, _ in candidates]
+
+        if next_faller is not None:
+            for plan, state, points in candidates:
+                if self._out_of_budget(deadline):
+                    break
+                if plan.score == GAME_OVER_SCORE:
+                    continue
+                plan.score = points + self._settled_value(state, next_faller, deadline)
+                plan.lookahead = True
+
+            # plans are searched best first, so the ones that got the deeper search are the ones worth comparing
+            searched = [plan for plan in plans if plan.lookahead]
+            if searched:
+                plans = searched
+
+        best = max(plans, key=lambda plan: plan.score)
+        best.evaluated = self._evaluated
+        return best
+
+    def _settled_value(self, state: engine.GameState, next_faller: engine.Faller | None, deadline: float | None) -> float:
+        '''Scores a settled board, looking one faller further if next_faller is given'''
+        key = (state.board_hash(), None if next_faller is None else (next_faller.col(), *(next_faller.get_jewel(n).jewel for n in range(3))))
+        value = self._table.get(key)
+        if value is not None:
+            return value
+
+        if next_faller is None:
+            value = self._evaluate(state)
+        else:
+            value = GAME_OVER_SCORE
+            spawned = state.clone()
+            if spawned.try_spawn_faller(next_faller.clone()):
+                for _, _, child in self._placements(spawned):
+                    points = self._drop(child)
+                    if not child.game_over():
+                        value = max(value, points + self._settled_value(child, None, deadline))
+                    if self._out_of_budget(deadline):
+                        break
+
+        self._table[key] = value
+        return value
+
+    def _out_of_budget(self, deadline: float | None) -> bool:
+        '''Returns True once the deeper search has used up its time or its evaluations'''
+        if self._max_evaluations is not None and self._evaluated >= self._max_evaluations:
+            return True
+        return deadline is not None and time.perf_counter() >= deadline
+
+    def _evaluate(self, state: engine.GameState) -> float:
+        '''Scores a settled board by its shape: low, flat stacks with free spawn cells are better'''
+        self._evaluated += 1
+
+        rows = state.rows()
+        board = state.board()
+        columns = [board.column_codes(c) for c in range(state.columns())]
+        heights = [board.column_height(c) for c in range(state.columns())]
+
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        # columns within three rows of the top can end the game on the next spawn
+        danger = sum(1 for height in heights if height > rows - 3)
+
+        # neighbouring jewels of the same colour are half of a future match
+        pairs = 0
+        for c, column in enumerate(columns):
+            right = columns[c + 1] if c + 1 < len(columns) else None
+            for r in range(rows - heights[c], rows):
+                jewel = column[r]
+                if r + 1 < rows and column[r + 1] == jewel:
+                    pairs += 1
+                if right is not None:
+                    if right[r] == jewel:
+                        pairs += 1
+                    if r + 1 < rows and right[r + 1] == jewel:
+                        pairs += 1
+                    if r > 0 and right[r - 1] == jewel:
+                        pairs += 1
+
+        return PAIR_WEIGHT * pairs - (HEIGHT_WEIGHT * sum(heights) + BUMPINESS_WEIGHT * bumpiness + DANGER_WEIGHT * danger)
+
+    def _placements(self, state: engine.GameState):
+        '''Yields (actions, rotations, state) for every column and rotation the active faller can reach;
+        each yielded state is a fresh copy the caller may keep playing'''
+        for rotations in range(3):
+            base = state.clone()
+            for _ in range(rotations):
+                if not base.try_rotate_faller():
+                    return
+
+            actions = ['R'] * rotations
+            yield actions, rotations, base.clone()
+
+            for step, move in (('<', engine.GameState.try_move_faller_left), ('>', engine.GameState.try_move_faller_right)):
+                moved = base.clone()
+                path = actions
+                while move(moved):
+                    path = path + [step]
+                    yield path, rotations, moved.clone()
+
+    def _drop(self, state: engine.GameState) -> int:
+        '''Drops the faller and settles the whole cascade it causes; returns the points scored'''
+        before = state.total_points() + state.current_points()
+
+        # the dropped faller freezes on the next tick, and settle() clears every match that causes
+        if state.try_hard_drop():
+            state.tick()
+        state.settle()
+
+        return state.total_points() + state.current_points() - before
@@ -1,17 +1,25 @@
 import pygame
 import time
 
+from timing import *
+
 INITIAL_SIZE = (800, 800)
-FRAME_RATE = 30
 
 BACKGROUND_COLOR = pygame.Color(20, 20, 20)
 BOARD_COLOR = pygame.Color(0, 0 , 0)
 CELL_BORDER_COLOR = pygame.Color(40, 40, 40)
 LANDED_COLOR = pygame.Color(255, 255, 255)
 
-INITIAL_TICK_INTERVAL = 20
-MIN_NORMAL_TICK_INTERVAL = 4
-FAST_TICK_INTERVAL = 2
-
 MICRO_FONT = 'assets/fonts/Micro5-Regular.ttf'
-FONT_COLOR = pygame.Color(255, 255, 255)
\ No newline at end of file
+FONT_COLOR = pygame.Color(255, 255, 255)
+
+# jewel character -> color it is drawn in
+JEWEL_DRAW_COLORS = {
+    'R': pygame.Color(250, 90, 90),
+    'O': pygame.Color(250, 160, 90),
+    'Y': pygame.Color(250, 220, 90),
+    'G': pygame.Color(60, 140, 60),
+    'B': pygame.Color(90, 145, 210),
+    'P': pygame.Color(110, 75, 200),
+    'W': pygame.Color(200, 200, 200)
+}
@@ -5,16 +5,23 @@ from zoneinfo import ZoneInfo
 
 GAME_DATA_PATH = Path('data/games.json')
 LEADERBOARD_DATA_PATH = Path('data/leaderboard.json')
+REPLAY_DATA_PATH = Path('data/replays')
+
+# the leaderboard as last read or written, the (mtime, size) of the file it matches and the usernames on it;
+# it is only read again when the file on disk changes
+_leaderboard = None
+_leaderboard_stamp = None
+_leaderboard_users = set()
 
 
         
 def user_exists(username: str) -> bool:
-    data = _load_data(LEADERBOARD_DATA_PATH)
-    return any(record['username'] == username for record in data)
+    _leaderboard_records()
+    return username in _leaderboard_users
 
 def get_leaderboard(start: int = 1, end: int = 9) -> list[dict]:
-    data = _load_data(LEADERBOARD_DATA_PATH)
-    return data[start-1:end+1]
+    # copies, so callers cannot change the cached records
+    return [dict(record) for record in _leaderboard_records()[start-1:end+1]]
 
 def save_new_entry(username: str, score: int, time: int, level: int) -> None:
     game_data = _load_data(GAME_DATA_PATH)
@@ -28,7 +35,7 @@ def save_new_entry(username: str, score: int, time: int, level: int) -> None:
     })
     _save_data(GAME_DATA_PATH, game_data)
 
-    leaderboard_data = _load_data(LEADERBOARD_DATA_PATH)
+    leaderboard_data = [dict(record) for record in _leaderboard_records()]
 
     user_record = next((item for item in leaderboard_data if item['username'] == username), None)
 
@@ -52,6 +59,38 @@ def save_new_entry(username: str, score: int, time: int, level: int) -> None:
         record['placement'] = i + 1
 
     _save_data(LEADERBOARD_DATA_PATH, leaderboard_data)
+    _cache_leaderboard(leaderboard_data, _file_stamp(LEADERBOARD_DATA_PATH))
+
+def save_replay(username: str, data: bytes) -> Path:
+    REPLAY_DATA_PATH.mkdir(parents=True, exist_ok=True)
+
+    stamp = datetime.now(ZoneInfo('America/Los_Angeles')).strftime('%Y%m%d-%H%M%S')
+    file_path = REPLAY_DATA_PATH / f'{stamp}-{username}.clms'
+    file_path.write_bytes(data)
+
+    return file_path
+
+def _leaderboard_records() -> list[dict]:
+    '''Returns the cached leaderboard, reading the file again only if it changed since it was last read or written'''
+    # the file is checked before it is read, so a write in between is picked up by the next call
+    stamp = _file_stamp(LEADERBOARD_DATA_PATH)
+    if _leaderboard is None or stamp != _leaderboard_stamp:
+        _cache_leaderboard(_load_data(LEADERBOARD_DATA_PATH), stamp)
+    return _leaderboard
+
+def _cache_leaderboard(data: list[dict], stamp: tuple[int, int] | None) -> None:
+    global _leaderboard, _leaderboard_stamp, _leaderboard_users
+    _leaderboard = data
+    _leaderboard_stamp = stamp
+    _leaderboard_users = {record['username'] for record in data}
+
+def _file_stamp(file_path: Path) -> tuple[int, int] | None:
+    '''Returns the modification time and size of a file, or None if it does not exist'''
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 def _load_data(file_path: Path) -> list[dict]:
     if not file_path.exists():
@@ -2,6 +2,7 @@ import pygame
 
 from constants import *
 import helpers
+import fonts
 
 class EndGame(Exception):
     pass
@@ -19,6 +20,10 @@ class EndScreen():
 
         self._surface = pygame.display.get_surface()
 
+        # nothing on this screen changes, so it is rendered once per window size and only pushed again after a resize
+        self._banner = None
+        self._drawn_size = None
+
     def handle_events(self, events: list[pygame.event.Event]) -> None:
         pass
 
@@ -26,18 +31,31 @@ class EndScreen():
         pass
 
     def display(self) -> None:
-        self._surface.fill(BACKGROUND_COLOR)
+        surface = self._surface
+        if surface.get_size() == self._drawn_size:
+            return
 
-        self._draw_game_over()
+        if self._banner is None or self._banner.get_size() != surface.get_size():
+            self._banner = self._render_banner()
+
+        surface.blit(self._banner, (0, 0))
 
         pygame.display.flip()
+        self._drawn_size = surface.get_size()
 
-    def _draw_text(self, top: float, text_str: str, font_size: float, font_style: str = MICRO_FONT, font_color: pygame.Color = FONT_COLOR) -> None:
-        surface = self._surface
+    def _render_banner(self) -> pygame.Surface:
+        '''Renders the whole screen onto a new window-sized surface'''
+        banner = pygame.Surface(self._surface.get_size()).convert(self._surface)
+        banner.fill(BACKGROUND_COLOR)
+
+        self._draw_game_over(banner)
+
+        return banner
+
+    def _draw_text(self, surface: pygame.Surface, top: float, text_str: str, font_size: float, font_style: str = MICRO_FONT, font_color: pygame.Color = FONT_COLOR) -> None:
         winw, winh = surface.get_size()
 
-        font = pygame.font.Font(font_style, int(font_size * winh))
-        text = font.render(text_str, True, font_color)
+        text = fonts.render_text(font_style, int(font_size * winh), text_str, font_color)
 
         text_rect = text.get_rect()
         text_rect.centerx = 0.5 * winw
@@ -45,6 +63,6 @@ class EndScreen():
 
         surface.blit(text, text_rect)
 
-    def _draw_game_over(self):
-        self._draw_text(0.05, 'GAME OVER', 0.2)
-        self._draw_text(0.2, f'SCORE: {self._score}   TIME: {helpers._frames_to_str(self._time)}   LEVEL: {self._level}', 0.075)
+    def _draw_game_over(self, surface: pygame.Surface):
+        self._draw_text(surface, 0.05, 'GAME OVER', 0.2)
+        self._draw_text(surface, 0.2, f'SCORE: {self._score}   TIME: {helpers._frames_to_str(self._time)}   LEVEL: {self._level}', 0.075)
@@ -1,5 +1,12 @@
+from array import array
 from dataclasses import dataclass
 
+# NumPy is an optional extra, not in requirements.txt: only use_numpy=True and batch_engine.py need it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 
 # Raised when the board is created with an invalid number of rows
@@ -24,17 +31,69 @@ class InvalidFaller(Exception):
 
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Cell:
     state: int   # 0 empty, 1 falling, 2 landed, 3 frozen, 4 matched
     jewel: str | None
 
 
+EMPTY_CELL = Cell(0, None)
+
+
+
+@dataclass
+class ChangeSet:
+    rows_cols: list[tuple[int, int]]    # (row, col), as in board()[row][col], of every changed cell, top to bottom
+    points_delta: int               # change in total_points()
+    current_points_delta: int       # change in current_points()
+    has_match: bool
+    match_changed: bool             # True if has_match() flipped
+    game_over: bool
+
+    def is_empty(self) -> bool:
+        return not self.rows_cols and not self.points_delta and not self.current_points_delta and not self.match_changed
+
+
+
+# jewels are stored on the board as one-byte codes; code 0 is an empty cell
+_JEWEL_CODES = {}
+_CODE_JEWELS = [None]
+
+def jewel_code(jewel: str) -> int:
+    '''Returns the byte code for a jewel, assigning a new code the first time it is seen'''
+    code = _JEWEL_CODES.get(jewel)
+    if code is None:
+        code = len(_CODE_JEWELS)
+        if code > 255:
+            raise InvalidFaller(f'Cannot use jewel {jewel!r}, only 255 distinct jewels are supported')
+        _JEWEL_CODES[jewel] = code
+        _CODE_JEWELS.append(jewel)
+    return code
+
+def code_jewel(code: int) -> str | None:
+    '''Returns the jewel stored on boards as the given byte code; code 0 is an empty cell'''
+    return _CODE_JEWELS[code]
+
+# Cells are immutable, so each (state, jewel code) pair is built once and shared by every board
+_CELLS = [[None] * 256 for _ in range(5)]
+_CELLS[0][0] = EMPTY_CELL
+
+def _cell(state: int, code: int) -> Cell:
+    '''Returns the shared Cell for a state and jewel code'''
+    cell = _CELLS[state][code]
+    if cell is None:
+        cell = _CELLS[state][code] = Cell(state, _CODE_JEWELS[code])
+    return cell
+
+
 
 class Faller():
+    __slots__ = ('_col', '_jewels', '_codes', '_state', '_bottom_row', '_coords', '_prev_coords')
+
     def __init__(self, col: int, jewels: list[str]) -> None:
         self._col = col - 1 
         self._jewels = self._validate_faller(jewels)
+        self._codes = [jewel_code(jewel) for jewel in jewels]
         
         # STATES
         #   FALLING = 1
@@ -43,7 +102,11 @@ class Faller():
         self._state = 1
         self._bottom_row = 0
 
-        self._prev_coords = []
+        # coordinates are rebuilt only when the faller moves; a falling tick replaces them with new tuples, so it
+        # still allocates a little, but nothing it allocates outlives the next move
+        self._coords = ()
+        self._update_coords()
+        self._prev_coords = ()
 
     def state(self) -> int:
         return self._state
@@ -54,56 +117,70 @@ class Faller():
     def col(self) -> int:
         return self._col
     
-    def coords(self) -> list[tuple[int, int]]:
+    def coords(self) -> tuple[tuple[int, int], ...]:
         '''Returns the (col, row) coordinates of the faller's three jewels from top to bottom'''
-        row = self._bottom_row
-        col = self._col
-        
-        coords = []
-
-        for _ in range(3):
-            coords.insert(0, (col, row))
-            row -= 1
-
-        return coords
+        return self._coords
     
-    def prev_coords(self) -> list[tuple[int, int]]:
+    def prev_coords(self) -> tuple[tuple[int, int], ...]:
         return self._prev_coords
     
     def update_prev_coords(self) -> None:
-        self._prev_coords = self.coords()
+        self._prev_coords = self._coords
     
     def get_jewel(self, n: int) -> Cell:
         '''Returns the nth jewel of the faller as a Cell with the current state'''
-        state = self._state
-        jewel = self._jewels[n]
+        return _cell(self._state, self._codes[n])
 
-        return Cell(state, jewel)
+    def jewel_code(self, n: int) -> int:
+        '''Returns the board byte code of the nth jewel of the faller'''
+        return self._codes[n]
         
     def update_state(self, state: int) -> None:
         self._state = state
 
-    def move_down(self) -> None:
-        self._bottom_row += 1
+    def move_down(self, rows: int = 1) -> None:
+        self._bottom_row += rows
+        self._update_coords()
 
     def rotate(self) -> None:
         self._must_not_be_frozen('rotate')
 
         jewels = self._jewels
-        jewels.insert(0, jewels[2])
-        del jewels[3]
+        jewels[0], jewels[1], jewels[2] = jewels[2], jewels[0], jewels[1]
+
+        codes = self._codes
+        codes[0], codes[1], codes[2] = codes[2], codes[0], codes[1]
 
     def move_left(self) -> None:
         self._must_not_be_frozen('move')
 
         self._col -= 1
         self._state = 1
+        self._update_coords()
 
     def move_right(self) -> None:
         self._must_not_be_frozen('move')
 
         self._col += 1
         self._state = 1
+        self._update_coords()
+
+    def clone(self) -> 'Faller':
+        '''Returns an independent copy of the faller in the same position and state'''
+        faller = Faller.__new__(Faller)
+        faller._col = self._col
+        faller._jewels = list(self._jewels)
+        faller._codes = list(self._codes)
+        faller._state = self._state
+        faller._bottom_row = self._bottom_row
+        faller._coords = self._coords
+        faller._prev_coords = self._prev_coords
+        return faller
+
+    def _update_coords(self) -> None:
+        col = self._col
+        row = self._bottom_row
+        self._coords = ((col, row - 2), (col, row - 1), (col, row))
 
     def _validate_faller(self, jewels: list[str]) -> list[str]:
         '''Ensures the faller has exactly three one-character jewels; raise InvalidFaller otherwise'''
@@ -123,14 +200,102 @@ class Faller():
         
 
 
+class BoardRow():
+    __slots__ = ('_game', '_row')
+
+    def __init__(self, game: 'GameState', row: int) -> None:
+        self._game = game
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._game._columns
+
+    def __getitem__(self, col: int) -> Cell:
+        game = self._game
+        i = col * game._rows + self._row
+        return _cell(game._states[i], game._jewels[i])
+
+    def __iter__(self):
+        for col in range(self._game._columns):
+            yield self[col]
+
+
+
+class BoardView():
+    '''Read-only row-major view of a GameState board; board[row][col] reads straight from the game's buffers'''
+    __slots__ = ('_game', '_rows')
+
+    def __init__(self, game: 'GameState') -> None:
+        self._game = game
+        self._rows = [BoardRow(game, r) for r in range(game._rows)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, row: int) -> BoardRow:
+        return self._rows[row]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def version(self) -> int:
+        '''Returns a counter that increases every time a cell on the board changes'''
+        return self._game._version
+
+    def cell(self, row: int, col: int) -> Cell:
+        return self._rows[row][col]
+
+    def top_row(self) -> BoardRow:
+        return self._rows[0]
+
+    def column_codes(self, col: int) -> bytes:
+        '''Returns the column's jewel codes from top to bottom; 0 is an empty cell and equal codes are equal jewels'''
+        game = self._game
+        top = col * game._rows
+        return bytes(game._jewels[top:top + game._rows])
+
+    def column_states(self, col: int) -> bytes:
+        '''Returns the column's cell states from top to bottom'''
+        game = self._game
+        top = col * game._rows
+        return bytes(game._states[top:top + game._rows])
+
+    def column_height(self, col: int) -> int:
+        '''Returns the number of cells from the bottom of the column up to and including its highest jewel'''
+        game = self._game
+        height = game._heights[col]
+
+        # a faller that has not frozen yet is not part of the stack, but it is on the board
+        faller = game._faller
+        if faller is not None and faller.state() != 3 and faller.col() == col and faller.bottom_row() >= 0:
+            height = max(height, game._rows - max(0, faller.bottom_row() - 2))
+
+        return height
+
+
+
+@dataclass
+class SettleResult:
+    board: BoardView
+    points: int     # points the cascade added to current_points()
+    depth: int      # match clears it took, the same as the number of ticks it would have taken
+
+
+
 class GameState():
-    def __init__(self, rows: int, columns: int) -> None:
+    def __init__(self, rows: int, columns: int, use_numpy: bool = False) -> None:
         # true number of rows and columns
         self._rows = rows
         self._columns = columns
+
+        # finds matches with vectorized NumPy comparisons instead of Python loops; pays off on large boards
+        if use_numpy and np is None:
+            raise ImportError('NumPy is required for use_numpy=True')
+        self._use_numpy = use_numpy
         
-        # the game board is stored as a column-major 2D list of Cells
-        self._board = self._create_empty_game_board()
+        # the game board is stored column-major in two flat byte buffers indexed by col * rows + row:
+        # one holds the jewel codes (0 = empty) and the other holds the cell states
+        self._jewels, self._states = self._create_empty_game_board()
 
         self._faller = None
 
@@ -138,6 +303,13 @@ class GameState():
         self._matches_count = 0
         self._has_match = False
 
+        # board indices changed since the last match search; None forces a full board scan
+        self._dirty = set()
+        # columns that may have gaps for gravity to close
+        self._dirty_columns = set()
+        # number of settled jewels in each column; gravity keeps them packed at the bottom
+        self._heights = array('I', bytes(4 * columns))
+
         self._turn_num = 1
         self._total_points = 0
         # adds to total points and resets after every new faller
@@ -145,8 +317,22 @@ class GameState():
 
         self._game_over = False
 
-    def _create_empty_game_board(self) -> list[list[Cell]]:
-        '''Returns a new empty board; raises an error if row/column counts are invalid'''
+        # bumped whenever a cell changes so board() readers can skip redrawing an unchanged board
+        self._version = 0
+        # created on the first board() call
+        self._view = None
+
+        # per-column hashes for board_hash(); only columns written since the last call are rehashed
+        self._column_hashes = [0] * columns
+        self._unhashed_columns = set(range(columns))
+
+        # board index -> (jewel code, state) it held before its first write since the last take_changes() call,
+        # and the points and match flag at that call; None until track_changes() is called
+        self._changed = None
+        self._change_base = None
+
+    def _create_empty_game_board(self) -> tuple[bytearray, bytearray]:
+        '''Returns new empty jewel and state buffers; raises an error if row/column counts are invalid'''
         rows = self._rows
         cols = self._columns
         
@@ -155,9 +341,7 @@ class GameState():
         if cols < 3:
             raise InvalidBoardColumns(f'Board must have at least 3 columns, but {cols} were provided.')
         
-        board = [[Cell(0, None) for _ in range(rows)] for _ in range(cols)]
-        
-        return board
+        return bytearray(rows * cols), bytearray(rows * cols)
 
     def rows(self) -> int:
         return self._rows
@@ -165,16 +349,103 @@ class GameState():
     def columns(self) -> int:
         return self._columns
     
-    def board(self) -> list[list[Cell]]:
-        '''Returns the board as a row-major 2D list of Cells'''
+    def board(self) -> BoardView:
+        '''Returns a live, read-only row-major view of the board'''
+        if self._view is None:
+            self._view = BoardView(self)
+        return self._view
+
+    def clone(self) -> 'GameState':
+        '''Returns an independent copy of the game, including the faller, matches, turn number and points'''
+        game = GameState.__new__(GameState)
+        game.__dict__.update(self.__dict__)
+
+        # the whole board is two flat buffers, so copying it is two memcpys
+        game._jewels = bytearray(self._jewels)
+        game._states = bytearray(self._states)
+
+        if self._faller is not None:
+            game._faller = self._faller.clone()
+
+        game._matches = set(self._matches)
+        if self._dirty is not None:
+            game._dirty = set(self._dirty)
+        game._dirty_columns = set(self._dirty_columns)
+        game._heights = array('I', self._heights)
+        game._view = None
+
+        game._column_hashes = list(self._column_hashes)
+        game._unhashed_columns = set(self._unhashed_columns)
+
+        if self._changed is not None:
+            game._changed = dict(self._changed)
+
+        return game
+
+    def board_hash(self) -> int:
+        '''Returns a hash of the jewels on the board, rehashing only the columns that changed since the last call'''
         rows = self._rows
-        cols = self._columns
-        row_board = [[self._board[c][r] for c in range(cols)] for r in range(rows)]
-        return list(row_board)
+        jewels = self._jewels
+        hashes = self._column_hashes
+
+        for c in self._unhashed_columns:
+            hashes[c] = hash(bytes(jewels[c * rows:(c + 1) * rows]))
+        self._unhashed_columns.clear()
+
+        return hash(tuple(hashes))
+
+    def track_changes(self) -> None:
+        '''Starts collecting the changes that take_changes() returns, starting from the current board'''
+        self._changed = {}
+        self._change_base = self._change_snapshot()
+
+    def take_changes(self) -> ChangeSet:
+        '''Returns everything that changed since the last call, or since track_changes() on the first call'''
+        if self._changed is None:
+            raise IllegalAction('Cannot take changes before track_changes() is called.')
+
+        total_points, current_points, has_match = self._change_base
+        rows = self._rows
+        jewels = self._jewels
+        states = self._states
+
+        # a cell can be written several times and end up as it was, so only cells that differ are reported
+        rows_cols = []
+        for i, (jewel, state) in self._changed.items():
+            if jewels[i] != jewel or states[i] != state:
+                c, r = divmod(i, rows)
+                rows_cols.append((r, c))
+        rows_cols.sort()
+
+        changes = ChangeSet(rows_cols, self._total_points - total_points, self._current_points - current_points,
+                            self._has_match, self._has_match != has_match, self._game_over)
+
+        self._changed.clear()
+        self._change_base = self._change_snapshot()
+
+        return changes
+
+    def _change_snapshot(self) -> tuple:
+        return self._total_points, self._current_points, self._has_match
+
+    def _note_writes(self, indices) -> None:
+        '''Remembers what the given cells hold before they are written, unless they were already written since the
+        last take_changes() call; must be called before the write, and only while changes are tracked'''
+        changed = self._changed
+        jewels = self._jewels
+        states = self._states
+        for i in indices:
+            if i not in changed:
+                changed[i] = (jewels[i], states[i])
     
     def load(self, data: list[str]) -> None:
         '''Loads initial field data, apply gravity, and mark any initial matches'''
+        if self._changed is not None:
+            self._note_writes(range(self._rows * self._columns))
         self._load(data)
+        self._dirty = None
+        self._dirty_columns.update(range(self._columns))
+        self._unhashed_columns.update(range(self._columns))
 
         self._apply_gravity()
 
@@ -183,16 +454,21 @@ class GameState():
     def _load(self, data: list[str]) -> None:
         '''Populates the board using raw input lines; spaces create empty cells'''
         self._validate_initial_field_data(data)
-        
-        jewels = [[char for char in line] for line in data]
 
-        for r in range(self._rows):
-            for c in range(self._columns):
-                jewel = jewels[r][c]
+        rows = self._rows
+        jewels = self._jewels
+        states = self._states
+        self._version += 1
+
+        for r, line in enumerate(data):
+            for c, jewel in enumerate(line):
+                i = c * rows + r
                 if jewel != ' ':
-                    self._board[c][r] = Cell(3, jewel)
+                    jewels[i] = jewel_code(jewel)
+                    states[i] = 3
                 else:
-                    self._board[c][r] = Cell(0, None)
+                    jewels[i] = 0
+                    states[i] = 0
 
     def _validate_initial_field_data(self, data) -> None:
         '''Ensures initial field data matches the board's expected dimensions'''
@@ -205,18 +481,40 @@ class GameState():
 
     def spawn_faller(self, faller: Faller) -> None:
         '''Spawns a new faller in the given column; raises an error if illegal or space is blocked'''
+        error = self._spawn_error(faller)
+        if error is not None:
+            raise IllegalAction(error)
+
+        self._spawn(faller)
+
+    def try_spawn_faller(self, faller: Faller) -> bool:
+        '''Same as spawn_faller, but returns False instead of raising if the faller cannot be spawned'''
+        if self._spawn_error(faller) is not None:
+            return False
+
+        self._spawn(faller)
+        return True
+
+    def _spawn_error(self, faller: Faller) -> str | None:
+        '''Returns why the faller cannot be spawned, or None if it can; a full spawn column ends the game'''
         col = faller.col()
 
+        if not 0 <= col < self._columns:
+            return f'Cannot spawn faller in column {col + 1}, the board has columns 1 to {self._columns}.'
+
         if self._faller is not None:
-            raise IllegalAction('Cannot spawn a new faller when one is still active.')
+            return 'Cannot spawn a new faller when one is still active.'
             
         if self._has_match is True:
-            raise IllegalAction('Cannot spawn a new faller when all matches are not cleared.')
+            return 'Cannot spawn a new faller when all matches are not cleared.'
         
-        if self._board[col][0].jewel is not None:
+        if self._heights[col] == self._rows:
             self._game_over = True
-            raise IllegalAction(f'Cannot spawn faller, column {col + 1} is full')
+            return f'Cannot spawn faller, column {col + 1} is full'
+
+        return None
 
+    def _spawn(self, faller: Faller) -> None:
         self._faller = faller
         self._update_faller_state()
         self._update_board()
@@ -232,34 +530,7 @@ class GameState():
         faller = self._faller
 
         if self._has_match:
-            self._clear_matches()
-            self._has_match = False
-
-            # calculate current points
-            self._current_points += 2**self._turn_num * 100 * self._matches_count
-            self._turn_num += 1
-
-            if faller != None:
-                offboard = self._check_offboard_frozen_jewels()
-                
-                if offboard != []:
-                    self._resolve_offboard_frozen_jewels(offboard)
-                else:
-                    # if the matches are now all cleared and there are no more offboard jewels,
-                    # faller is now completely frozen and on the board
-                    self._faller = None
-
-            self._apply_gravity()
-            self._find_and_mark_matches()
-
-            if self._has_match:
-                self._game_over = False
-            else:
-                # catches the special case where there are two offboard frozen jewels and one frozen jewel
-                # in a match on the board. after the next tick, there is another match with the second jewel
-                # from the bottom of the faller (the first jewel is cleared) and there is still one offboard
-                # frozen jewel. this makes sure faller is set to NONE when there is no matches left.
-                self._faller = None
+            self._resolve_matches()
             
         elif faller is not None:
             # updates state before movement to detect landing on spawn
@@ -275,6 +546,10 @@ class GameState():
             # If the faller is frozen this tick
             if faller.state() == 3:
 
+                # the faller landed on top of the stack, so its cells on the board now extend it
+                self._heights[faller.col()] += sum(1 for _, r in faller.coords() if r >= 0)
+
+                self._mark_faller_dirty()
                 self._find_and_mark_matches()
 
                 # if there are matches, handle the matches first
@@ -290,50 +565,95 @@ class GameState():
                     # faller is now completely frozen and on the board
                     self._faller = None
         
-    def _check_offboard_frozen_jewels(self) -> list[Cell]:
-        '''Returns any frozen faller jewels whose coordinates lie above row 0'''
+    def settle(self) -> SettleResult:
+        '''Clears matches until none are left, with the same result and points as ticking through the cascade;
+        does nothing if there is no match to clear'''
+        points = self._current_points
+        depth = 0
+
+        while self._has_match:
+            # matches are cleared in the same call they are found, so they are never marked for display
+            self._resolve_matches(mark=False)
+            depth += 1
+
+        return SettleResult(self.board(), self._current_points - points, depth)
+
+    def _resolve_matches(self, mark: bool = True) -> None:
+        '''Clears the current matches, scores them, lets the board fall and finds the next matches'''
+        self._clear_matches()
+        self._has_match = False
+
+        # calculate current points
+        self._current_points += 2**self._turn_num * 100 * self._matches_count
+        self._turn_num += 1
+
+        if self._faller != None:
+            offboard = self._check_offboard_frozen_jewels()
+            
+            if offboard != []:
+                self._resolve_offboard_frozen_jewels(offboard)
+            else:
+                # if the matches are now all cleared and there are no more offboard jewels,
+                # faller is now completely frozen and on the board
+                self._faller = None
+
+        self._dirty.update(self._apply_gravity())
+        self._find_and_mark_matches(mark)
+
+        if self._has_match:
+            self._game_over = False
+        else:
+            # catches the special case where there are two offboard frozen jewels and one frozen jewel
+            # in a match on the board. after the next tick, there is another match with the second jewel
+            # from the bottom of the faller (the first jewel is cleared) and there is still one offboard
+            # frozen jewel. this makes sure faller is set to NONE when there is no matches left.
+            self._faller = None
+
+    def _check_offboard_frozen_jewels(self) -> list[tuple[int, int]]:
+        '''Returns the (jewel code, state) of any frozen faller jewels whose coordinates lie above row 0'''
         faller = self._faller
 
         offboard = [] # only need to handle the column the faller is in
 
         for n, (_, r) in enumerate(faller.coords()):
             if r < 0:
-                cell = faller.get_jewel(n)
-                offboard.append(cell)
+                offboard.append((faller.jewel_code(n), faller.state()))
 
         return offboard
 
-    def _resolve_offboard_frozen_jewels(self, offboard: list[Cell]) -> None:
+    def _resolve_offboard_frozen_jewels(self, offboard: list[tuple[int, int]]) -> None:
         '''Places offboard jewels into the column, adjusts faller position, or triggers game over'''
         rows = self._rows
-        cols = self._columns
-        board = self._board
+        jewels = self._jewels
+        states = self._states
         faller = self._faller
 
-        combined = offboard + board[faller.col()]
-        jewels = []
-        spaces = 0
-        for cell in combined:
-            if cell.jewel is None:
-                spaces += 1
-            else:
-                jewels.append(cell)
+        start = faller.col() * rows
+        end = start + rows
 
-        for _ in range(spaces):
-            faller.move_down()
+        combined = offboard + list(zip(jewels[start:end], states[start:end]))
+        stack = [cell for cell in combined if cell[0]]
+        spaces = len(combined) - len(stack)
+
+        faller.move_down(spaces)
 
         # if there are more jewels than rows, game over
-        if len(jewels) > rows:
+        if len(stack) > rows:
             self._game_over = True
-            extras = len(jewels) - rows
-            new_col = jewels[extras:]
-        else:
-            empties = rows - len(jewels)
-            new_col = [Cell(0, None) for _ in range(empties)] + jewels
-
-        self._board[faller.col()] = new_col
+            extras = len(stack) - rows
+            stack = stack[extras:]
+
+        empties = rows - len(stack)
+        if self._changed is not None:
+            self._note_writes(range(start, end))
+        jewels[start:end] = bytes(empties) + bytes(jewel for jewel, _ in stack)
+        states[start:end] = bytes(empties) + bytes(state for _, state in stack)
         offboard.clear()
 
+        self._dirty.update(range(start + empties, end))
+        self._dirty_columns.add(faller.col())
+        self._unhashed_columns.add(faller.col())
+
     def rotate_faller(self) -> None:
         '''Rotates the active faller's jewels; raises an error if no faller is active'''
         if self._faller is None:
@@ -342,42 +662,120 @@ class GameState():
         self._faller.rotate()
         self._update_board()
 
+    def try_rotate_faller(self) -> bool:
+        '''Same as rotate_faller, but returns False instead of raising if there is no faller to rotate'''
+        faller = self._faller
+        if faller is None or faller.state() == 3:
+            return False
+
+        faller.rotate()
+        self._update_board()
+        return True
+
     def move_faller_left(self) -> None:
         '''Moves the active faller left if the column is free; raise error otherwise'''
-        faller = self._faller
-        if self._faller is None:
-            raise IllegalAction('Cannot move left — no active faller.')
+        error = self._move_error(-1)
+        if error is not None:
+            raise IllegalAction(error)
 
-        left_col = 0
-        if faller.col() == left_col:
-            raise IllegalAction('Faller is in left-most column, cannot move left.')
-        
-        board = self._board
-        for c, r in faller.coords():
-            if r >= 0 and board[c-1][r].jewel is not None:
-                raise IllegalAction(f'Cell ({c-1}, {r}) is occupied — cannot move faller left.')
-        
-        faller.move_left()
+        self._faller.move_left()
         self._update_faller_state()
         self._update_board()
+
+    def try_move_faller_left(self) -> bool:
+        '''Same as move_faller_left, but returns False instead of raising if the faller cannot move'''
+        if not self._can_move(-1):
+            return False
+
+        self._faller.move_left()
+        self._update_faller_state()
+        self._update_board()
+        return True
             
     def move_faller_right(self) -> None:
         '''Moves the active faller right if the column is free; raise error otherwise'''
+        error = self._move_error(1)
+        if error is not None:
+            raise IllegalAction(error)
+
+        self._faller.move_right()
+        self._update_faller_state()
+        self._update_board()
+
+    def try_move_faller_right(self) -> bool:
+        '''Same as move_faller_right, but returns False instead of raising if the faller cannot move'''
+        if not self._can_move(1):
+            return False
+
+        self._faller.move_right()
+        self._update_faller_state()
+        self._update_board()
+        return True
+
+    def _can_move(self, step: int) -> bool:
+        '''Returns True if the active faller can move one column left (step -1) or right (step 1)'''
         faller = self._faller
-        if self._faller is None:
-            raise IllegalAction('Cannot move right — no active faller.')
+        if faller is None or faller.state() == 3:
+            return False
+
+        col = faller.col() + step
+        if col < 0 or col >= self._columns:
+            return False
 
-        right_col = self._columns - 1
-        if faller.col() == right_col:
-            raise IllegalAction('Faller is in right-most column, cannot move right.')
+        rows = self._rows
+        jewels = self._jewels
+        for _, r in faller.coords():
+            if r >= 0 and jewels[col * rows + r]:
+                return False
+
+        return True
+
+    def _move_error(self, step: int) -> str | None:
+        '''Returns why the active faller cannot move one column left (step -1) or right (step 1), or None if it can'''
+        if self._can_move(step):
+            return None
+
+        side = 'left' if step < 0 else 'right'
+        faller = self._faller
+        if faller is None:
+            return f'Cannot move {side} — no active faller.'
+
+        if faller.col() == (0 if step < 0 else self._columns - 1):
+            return f'Faller is in {side}-most column, cannot move {side}.'
         
-        board = self._board
+        rows = self._rows
+        jewels = self._jewels
         for c, r in faller.coords():
-            if r >= 0 and board[c+1][r].jewel is not None:
-                raise IllegalAction(f'Cell ({c+1}, {r}) is occupied — cannot move faller right.')
-        
-        faller.move_right()
-        self._update_faller_state()
+            if r >= 0 and jewels[(c + step) * rows + r]:
+                return f'Cell ({c + step}, {r}) is occupied — cannot move faller {side}.'
+
+        return 'Cannot move a frozen faller.'
+
+    def hard_drop(self) -> None:
+        '''Moves the active faller straight down onto the stack below it; it freezes on the next tick'''
+        faller = self._faller
+        if faller is None:
+            raise IllegalAction('Cannot drop — no active faller.')
+        if faller.state() == 3:
+            raise IllegalAction('Cannot drop a frozen faller.')
+
+        self._drop()
+
+    def try_hard_drop(self) -> bool:
+        '''Same as hard_drop, but returns False instead of raising if there is no faller to drop'''
+        faller = self._faller
+        if faller is None or faller.state() == 3:
+            return False
+
+        self._drop()
+        return True
+
+    def _drop(self) -> None:
+        faller = self._faller
+
+        # same as ticking until the faller lands, without the ticks in between
+        faller.move_down(self._landing_row(faller.col()) - faller.bottom_row())
+        faller.update_state(2)
         self._update_board()
 
     def faller(self) -> Faller | None:
@@ -399,26 +797,100 @@ class GameState():
         '''Force the game into game over state'''
         self._game_over = True
 
-    def _apply_gravity(self) -> None:
-        '''Lets jewels fall within each column by sliding non-empty cells downward'''
+    def apply_actions(self, actions) -> list[bool]:
+        '''Applies a script of shell protocol actions ('' tick, 'F col a b c', 'R', '<', '>', 'Q') without raising;
+        returns whether each action was legal and stops after the action that ends the game'''
+        results = []
+        append = results.append
+
+        tick = self.tick
+        moves = {
+            'R': self.try_rotate_faller,
+            '<': self.try_move_faller_left,
+            '>': self.try_move_faller_right
+        }
+
+        for action in actions:
+            if action == '':
+                tick()
+                append(True)
+            elif action in moves:
+                append(moves[action]())
+            elif action.startswith('F'):
+                append(self._try_spawn_action(action))
+            elif action == 'Q':
+                self.end()
+                append(True)
+            else:
+                append(False)
+
+            if self._game_over:
+                break
+
+        return results
+
+    def _try_spawn_action(self, action: str) -> bool:
+        '''Spawns the faller of an 'F col a b c' action; returns False if the line is malformed or cannot be spawned'''
+        parts = action.split()
+        try:
+            faller = Faller(int(parts[1]), parts[2:])
+        except (IndexError, ValueError, InvalidFaller):
+            return False
+
+        return self.try_spawn_faller(faller)
+
+    def _apply_gravity(self) -> list[int]:
+        '''Lets jewels fall within each dirty column; returns the board indices of the jewels that moved'''
         rows = self._rows
-        columns = self._columns
-        board = self._board
+        jewels = self._jewels
+        states = self._states
+        moved = []
+        tracking = self._changed is not None
+
+        for c in self._dirty_columns:
+            top = c * rows
+
+            # one stable pass from the bottom up, packing each jewel onto the one below it
+            dest = top + rows - 1
+            for src in range(dest, top - 1, -1):
+                jewel = jewels[src]
+                if jewel:
+                    if src != dest:
+                        # src is emptied below along with the rest of the space above the stack, which has no other jewels
+                        if tracking:
+                            self._note_writes((src, dest))
+                        jewels[dest] = jewel
+                        states[dest] = states[src]
+                        moved.append(dest)
+                    dest -= 1
+
+            # everything above the packed jewels is now empty
+            jewels[top:dest + 1] = bytes(dest + 1 - top)
+            states[top:dest + 1] = bytes(dest + 1 - top)
+
+            self._heights[c] = top + rows - 1 - dest
+
+        self._dirty_columns.clear()
+
+        return moved
+
+    def _find_and_mark_matches(self, mark: bool = True) -> None:
+        '''Finds all matches and marks them unless mark is False; update has_match accordingly'''
+        dirty = self._dirty
+        if self._use_numpy:
+            self._find_matches_numpy()
+        elif dirty is None:
+            self._find_matches()
+        else:
+            self._find_matches_through(dirty)
+        self._dirty = set()
 
-        for c in range(columns):
-            for r in range(rows - 1):
-                if board[c][r].jewel is not None and board[c][r+1].jewel is None:
-                    del board[c][r+1]
-                    board[c].insert(0, Cell(0, None))
-
-    def _find_and_mark_matches(self) -> None:
-        '''Finds all matches and marks them; update has_match accordingly'''
-        self._find_matches()
         matches = self._matches
 
         self._has_match = True if matches else False
 
-        self._mark_matches()
+        if mark:
+            self._mark_matches()
 
     def _find_matches(self) -> None:
         '''Returns a set of coordinates of all jewels forming runs of 3+ in any direction'''
@@ -427,7 +899,7 @@ class GameState():
 
         rows = self._rows
         columns = self._columns
-        board = self._board
+        jewels = self._jewels
 
         directions = [
             (1, 0), # horizontal
@@ -438,8 +910,8 @@ class GameState():
 
         for c in range(columns):
             for r in range(rows):
-                jewel = board[c][r].jewel
-                if jewel is None: # skips empty cells
+                jewel = jewels[c * rows + r]
+                if not jewel: # skips empty cells
                     continue
 
                 for dx, dy in directions:
@@ -454,7 +926,7 @@ class GameState():
                     run = [(c, r)]
                     x, y = c + dx, r + dy
 
-                    while 0 <= x < columns and 0 <= y < rows and board[x][y].jewel == jewel:
+                    while 0 <= x < columns and 0 <= y < rows and jewels[x * rows + y] == jewel:
                         run.append((x, y))
                         x += dx
                         y += dy
@@ -466,34 +938,159 @@ class GameState():
         self._matches = matches
         self._matches_count = count
     
+    def _find_matches_through(self, cells: set[int]) -> None:
+        '''Finds the runs of 3+ passing through the given board indices; same result as _find_matches
+        as long as every run on the board goes through one of the cells'''
+        matches = set()
+        count = 0
+        # (start index, direction) of every run already looked at
+        seen = set()
+
+        rows = self._rows
+        columns = self._columns
+        jewels = self._jewels
+
+        directions = [
+            (1, 0), # horizontal
+            (0, 1), # vertical
+            (1, 1), # diagonal down-right
+            (1, -1) # diagonal up-right
+        ]
+
+        for i in cells:
+            jewel = jewels[i]
+            if not jewel: # skips empty cells
+                continue
+
+            c, r = divmod(i, rows)
+            for dx, dy in directions:
+                # walks back to the first jewel of the run
+                x, y = c, r
+                while 0 <= x - dx < columns and 0 <= y - dy < rows and jewels[(x - dx) * rows + y - dy] == jewel:
+                    x -= dx
+                    y -= dy
+
+                key = (x * rows + y, dx, dy)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                run = [(x, y)]
+                x, y = x + dx, y + dy
+
+                while 0 <= x < columns and 0 <= y < rows and jewels[x * rows + y] == jewel:
+                    run.append((x, y))
+                    x += dx
+                    y += dy
+
+                if len(run) >= 3:
+                    matches.update(run)
+                    # the full scan counts a run of n once from each of its first n - 2 jewels
+                    count += len(run) - 2
+
+        self._matches = matches
+        self._matches_count = count
+
+    def _find_matches_numpy(self) -> None:
+        '''Same as _find_matches, but compares shifted copies of the whole board at once'''
+        board = np.frombuffer(self._jewels, dtype=np.uint8).reshape(self._columns, self._rows)
+        matches = np.zeros(board.shape, dtype=bool)
+        count = 0
+
+        # each direction as the (cols, rows) slices of the first, second and third jewel of every window of 3
+        directions = [
+            ((slice(None, -2), slice(None)), (slice(1, -1), slice(None)), (slice(2, None), slice(None))),      # horizontal
+            ((slice(None), slice(None, -2)), (slice(None), slice(1, -1)), (slice(None), slice(2, None))),      # vertical
+            ((slice(None, -2), slice(None, -2)), (slice(1, -1), slice(1, -1)), (slice(2, None), slice(2, None))), # diagonal down-right
+            ((slice(None, -2), slice(2, None)), (slice(1, -1), slice(1, -1)), (slice(2, None), slice(None, -2)))  # diagonal up-right
+        ]
+
+        for first, second, third in directions:
+            a, b, c = board[first], board[second], board[third]
+            windows = (a != 0) & (a == b) & (b == c)
+
+            # the full scan counts a run of n once from each of its first n - 2 jewels, one per window
+            count += int(np.count_nonzero(windows))
+
+            matches[first] |= windows
+            matches[second] |= windows
+            matches[third] |= windows
+
+        cols, rows = np.nonzero(matches)
+        self._matches = set(zip(cols.tolist(), rows.tolist()))
+        self._matches_count = count
+
+    def _mark_faller_dirty(self) -> None:
+        '''Adds the faller's on-board cells to the cells the next match search goes through'''
+        if self._dirty is None:
+            return
+
+        rows = self._rows
+        for c, r in self._faller.coords():
+            if r >= 0:
+                self._dirty.add(c * rows + r)
+
     def _mark_matches(self) -> None:
         '''Mark the given coordinates as matched (state = 4)'''
-        matches = self._matches
-        for c, r in matches:
-            self._board[c][r].state = 4
+        rows = self._rows
+        states = self._states
+        if self._changed is not None:
+            self._note_writes(c * rows + r for c, r in self._matches)
+
+        for c, r in self._matches:
+            states[c * rows + r] = 4
+
+        if self._matches:
+            self._version += 1
 
     def _clear_matches(self) -> None:
         '''Removes all matched cells with the matched state'''
-        matches = self._matches
-        for c, r in matches:
-            self._board[c][r] = Cell(0, None)
+        rows = self._rows
+        jewels = self._jewels
+        states = self._states
+        self._version += 1
+
+        if self._changed is not None:
+            self._note_writes(c * rows + r for c, r in self._matches)
+
+        for c, r in self._matches:
+            jewels[c * rows + r] = 0
+            states[c * rows + r] = 0
+            self._dirty_columns.add(c)
+            self._unhashed_columns.add(c)
 
     def _update_board(self) -> None:
         '''Redraw the faller's current cells on the board and clear its previous positions'''
-        board = self._board
+        rows = self._rows
+        jewels = self._jewels
+        states = self._states
         faller = self._faller
+        self._version += 1
+
+        prev_coords = faller.prev_coords()
+        if prev_coords:
+            self._unhashed_columns.add(prev_coords[0][0])
+        self._unhashed_columns.add(faller.col())
 
-        for c, r in faller.prev_coords():
+        if self._changed is not None:
+            self._note_writes(c * rows + r for c, r in prev_coords if r >= 0)
+            self._note_writes(c * rows + r for c, r in faller.coords() if r >= 0)
+
+        for c, r in prev_coords:
             if r >= 0:
-                if board[c][r].state == 1 or board[c][r].state == 2:
-                    board[c][r] = Cell(0, None)
+                i = c * rows + r
+                if states[i] == 1 or states[i] == 2:
+                    jewels[i] = 0
+                    states[i] = 0
 
         self._faller.update_prev_coords()
 
-        for n, coords in enumerate(faller.coords()):
-            c, r = coords
+        state = faller.state()
+        for n, (c, r) in enumerate(faller.coords()):
             if r >= 0:
-                board[c][r] = faller.get_jewel(n)
+                i = c * rows + r
+                jewels[i] = faller.jewel_code(n)
+                states[i] = state
 
     def _update_faller_state(self) -> None:
         '''Updates the faller's state (falling → landed → frozen) based on its surroundings'''
@@ -512,16 +1109,8 @@ class GameState():
     def _is_faller_landed(self) -> bool:
         '''Returns True if the faller is resting on the board bottom or another jewel'''
         faller = self._faller
-        board_bot_row = self._rows - 1
-        faller_bot_row = faller.bottom_row()
-        
-        if faller_bot_row == board_bot_row:
-            return True
-        
-        board = self._board
-        faller_col = faller.col()
-        if board[faller_col][faller_bot_row + 1].jewel is not None:
-            return True
-        
-        return False
+        return faller.bottom_row() == self._landing_row(faller.col())
 
+    def _landing_row(self, col: int) -> int:
+        '''Returns the row a faller's bottom jewel lands on in the given column'''
+        return self._rows - 1 - self._heights[col]
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pygame
+
+# fonts kept open at once; all the screens together use far fewer sizes than this for one window size
+MAX_FONTS = 32
+
+# rendered strings kept at once; the changing HUD values and every label on screen fit with room to spare
+MAX_TEXTS = 256
+
+# (font path, pixel size) -> Font, least recently used first
+_fonts = OrderedDict()
+
+# (text, font path, pixel size, color, antialias) -> rendered Surface, least recently used first
+_texts = OrderedDict()
+_text_hits = 0
+_text_misses = 0
+
+
+
+@dataclass
+class TextCacheStats:
+    hits: int
+    misses: int
+    size: int               # rendered strings currently cached
+
+
+
+def get_font(path: str, size: int) -> pygame.font.Font:
+    '''Returns the font at path in the given pixel size, loading the file only the first time the pair is asked for'''
+    key = (path, size)
+
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(path, size)
+        if len(_fonts) > MAX_FONTS:
+            _fonts.popitem(last=False)
+    else:
+        _fonts.move_to_end(key)
+
+    return font
+
+def render_text(path: str, size: int, text: str, color: pygame.Color, antialias: bool = True) -> pygame.Surface:
+    '''Returns text rendered in the font at path, rendering it only the first time it is asked for;
+    the surface is shared with later callers, so it must only be blitted, never drawn on'''
+    global _text_hits, _text_misses
+
+    key = (text, path, size, tuple(color), antialias)
+
+    surface = _texts.get(key)
+    if surface is None:
+        _text_misses += 1
+        surface = _texts[key] = get_font(path, size).render(text, antialias, color)
+        if len(_texts) > MAX_TEXTS:
+            _texts.popitem(last=False)
+    else:
+        _text_hits += 1
+        _texts.move_to_end(key)
+
+    return surface
+
+def text_cache_stats() -> TextCacheStats:
+    return TextCacheStats(_text_hits, _text_misses, len(_texts))
+
+def clear() -> None:
+    '''Forgets every cached font and rendered string; font sizes follow the window height, so a resize makes them all stale'''
+    _fonts.clear()
+    _texts.clear()
@@ -0,0 +1,335 @@
+import argparse
+import importlib.util
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import engine
+import shell
+
+try:
+    import batch_engine
+except ImportError:
+    batch_engine = None
+
+# jewels the random scripts draw from; fewer colors make more matches and deeper cascades
+DEFAULT_COLORS = 'RGBYP'
+
+# share of the random actions that are each kind of action; the rest are ticks
+SPAWN_RATE = 0.1
+ROTATE_RATE = 0.1
+MOVE_RATE = 0.2
+
+
+
+@dataclass
+class Script:
+    rows: int
+    cols: int
+    contents: list[str] | None              # initial field rows, or None for an empty field
+    actions: list[str] = field(default_factory=list)
+
+    def text(self) -> str:
+        '''Returns the script in the shell protocol, ready to be piped into shell.py'''
+        lines = [str(self.rows), str(self.cols)]
+        if self.contents is None:
+            lines.append('EMPTY')
+        else:
+            lines.append('CONTENTS')
+            lines += self.contents
+        lines += self.actions
+        return '\n'.join(lines) + '\n'
+
+
+
+@dataclass
+class Snapshot:
+    board: list[str]        # rows as display_board prints them
+    total_points: int
+    current_points: int
+    game_over: bool
+
+
+
+@dataclass
+class Divergence:
+    seed: int
+    step: int               # 0 is the initial field, n is the state after the nth action
+    action: str | None
+    name: str               # implementation that diverged from the reference
+    difference: str         # 'board', 'score' or 'game over'
+    expected: Snapshot
+    actual: Snapshot
+
+    def describe(self) -> str:
+        '''Returns the divergence and both boards side by side as printable lines'''
+        where = 'the initial field' if self.step == 0 else f'action #{self.step} {self.action!r}'
+        lines = [f'seed {self.seed}: {self.name} differs in {self.difference} after {where}']
+
+        expected, actual = self.expected, self.actual
+        width = len(expected.board[0]) if expected.board else 0
+        lines.append(f"{'reference':<{width}}   {self.name}")
+        for left, right in zip(expected.board, actual.board):
+            marker = ' ' if left == right else '*'
+            lines.append(f'{left} {marker} {right}')
+
+        lines.append(f'score     {expected.total_points} + {expected.current_points}   {actual.total_points} + {actual.current_points}')
+        lines.append(f'game over {expected.game_over}   {actual.game_over}')
+        return '\n'.join(lines)
+
+
+
+@dataclass
+class Throughput:
+    name: str
+    actions: int
+    seconds: float
+
+    def actions_per_second(self) -> float:
+        return self.actions / self.seconds if self.seconds > 0 else 0.0
+
+
+
+class GameStateRunner():
+    '''Plays scripts on a GameState the way shell.run_game does, catching IllegalAction after every action'''
+    def __init__(self, module = engine, **options) -> None:
+        self._module = module
+        self._options = options
+        self._game = None
+
+    def start(self, script: Script) -> None:
+        self._game = self._module.GameState(script.rows, script.cols, **self._options)
+        if script.contents is not None:
+            self._game.load(script.contents)
+
+    def step(self, action: str) -> None:
+        game = self._game
+        try:
+            if action == '':
+                game.tick()
+            elif action.startswith('F'):
+                parts = action.split()
+                game.spawn_faller(self._module.Faller(int(parts[1]), parts[2:]))
+            elif action == 'R':
+                game.rotate_faller()
+            elif action == '<':
+                game.move_faller_left()
+            elif action == '>':
+                game.move_faller_right()
+        except self._module.IllegalAction:
+            pass
+
+    def game_over(self) -> bool:
+        return self._game.game_over()
+
+    def snapshot(self) -> Snapshot:
+        game = self._game
+        return Snapshot(shell.board_lines(game.board()), game.total_points(), game.current_points(), game.game_over())
+
+
+
+class ScriptRunner(GameStateRunner):
+    '''Plays scripts on a GameState through the non-raising apply_actions(), a whole script per call'''
+    def step(self, action: str) -> None:
+        self._game.apply_actions([action])
+
+    def run(self, script: Script) -> int:
+        self.start(script)
+        return len(self._game.apply_actions(script.actions))
+
+
+
+class BatchRunner():
+    '''Plays scripts on a one-board batch_engine.BatchGameState'''
+    def __init__(self) -> None:
+        self._batch = None
+
+    def start(self, script: Script) -> None:
+        self._batch = batch_engine.BatchGameState(1, script.rows, script.cols)
+        if script.contents is not None:
+            self._batch.load(0, script.contents)
+
+    def step(self, action: str) -> None:
+        batch = self._batch
+        if action == '':
+            batch.tick()
+        elif action.startswith('F'):
+            parts = action.split()
+            batch.spawn_faller([int(parts[1])], batch_engine.jewel_codes([parts[2:]]))
+        elif action == 'R':
+            batch.rotate_faller()
+        elif action == '<':
+            batch.move_faller_left()
+        elif action == '>':
+            batch.move_faller_right()
+
+    def game_over(self) -> bool:
+        return bool(self._batch.game_over()[0])
+
+    def snapshot(self) -> Snapshot:
+        batch = self._batch
+        return Snapshot(shell.board_lines(batch.board(0)), int(batch.total_points()[0]),
+                        int(batch.current_points()[0]), bool(batch.game_over()[0]))
+
+
+
+def implementations() -> dict:
+    '''Returns a factory for every runner available with the installed packages, by name'''
+    runners = {
+        'reference': GameStateRunner,
+        'script': ScriptRunner
+    }
+    if engine.np is not None:
+        runners['numpy'] = lambda: GameStateRunner(use_numpy=True)
+    if batch_engine is not None:
+        runners['batch'] = BatchRunner
+    return runners
+
+
+def load_engine(path: Path):
+    '''Imports an alternative engine module with the same GameState, Faller and IllegalAction as engine.py'''
+    spec = importlib.util.spec_from_file_location(f'engine_{path.stem}', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_script(rng: random.Random, max_actions: int = 300, colors: str = DEFAULT_COLORS) -> Script:
+    '''Returns a random board size, an optional random initial field and a random list of protocol actions'''
+    rows = rng.randint(4, 14)
+    cols = rng.randint(3, 9)
+    colors = colors[:rng.randint(2, len(colors))]
+
+    contents = None
+    if rng.random() < 0.5:
+        # about half of the initial cells are empty, so the field has gaps for gravity to close
+        contents = [''.join(rng.choice(colors + ' ' * len(colors)) for _ in range(cols)) for _ in range(rows)]
+
+    script = Script(rows, cols, contents)
+    for _ in range(rng.randint(1, max_actions)):
+        x = rng.random()
+        if x < SPAWN_RATE:
+            script.actions.append(f'F {rng.randint(1, cols)} ' + ' '.join(rng.choice(colors) for _ in range(3)))
+        elif x < SPAWN_RATE + ROTATE_RATE:
+            script.actions.append('R')
+        elif x < SPAWN_RATE + ROTATE_RATE + MOVE_RATE:
+            script.actions.append(rng.choice('<>'))
+        else:
+            script.actions.append('')
+
+    return script
+
+
+def compare(script: Script, runners: dict, seed: int = 0) -> Divergence | None:
+    '''Plays the script on the reference runner and every other runner side by side;
+    returns the first divergence from the reference, or None if they all agree until the game ends'''
+    names = list(runners)
+    reference, others = runners[names[0]], [(name, runners[name]) for name in names[1:]]
+
+    for runner in runners.values():
+        runner.start(script)
+
+    action = None
+    for step in range(len(script.actions) + 1):
+        if step > 0:
+            action = script.actions[step - 1]
+            for runner in runners.values():
+                runner.step(action)
+
+        expected = reference.snapshot()
+        for name, runner in others:
+            actual = runner.snapshot()
+            difference = _difference(expected, actual)
+            if difference is not None:
+                return Divergence(seed, step, action, name, difference, expected, actual)
+
+        if expected.game_over:
+            break
+
+    return None
+
+
+def _difference(expected: Snapshot, actual: Snapshot) -> str | None:
+    if expected.board != actual.board:
+        return 'board'
+    if (expected.total_points, expected.current_points) != (actual.total_points, actual.current_points):
+        return 'score'
+    if expected.game_over != actual.game_over:
+        return 'game over'
+    return None
+
+
+def benchmark(scripts: list[Script], name: str, runner) -> Throughput:
+    '''Plays every script on the runner without snapshots; counts the actions played until each game ended'''
+    run = getattr(runner, 'run', None)
+
+    actions = 0
+    start = time.perf_counter()
+
+    for script in scripts:
+        if run is not None:
+            actions += run(script)
+            continue
+
+        runner.start(script)
+        for action in script.actions:
+            runner.step(action)
+            actions += 1
+            if runner.game_over():
+                break
+
+    return Throughput(name, actions, time.perf_counter() - start)
+
+
+
+def main() -> None:
+    available = implementations()
+
+    parser = argparse.ArgumentParser(description='Plays random shell protocol scripts on engine.GameState and other engine '
+                                                 'implementations side by side and reports where they diverge.')
+    parser.add_argument('-n', '--scripts', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first script; script i uses seed + i')
+    parser.add_argument('--max-actions', type=int, default=300)
+    parser.add_argument('--colors', default=DEFAULT_COLORS, help='jewels the scripts draw from')
+    parser.add_argument('--impl', action='append', choices=[name for name in available if name != 'reference'],
+                        help='implementation to compare with the reference; repeat for several (default: all)')
+    parser.add_argument('--engine', action='append', type=Path, default=[], metavar='PATH',
+                        help='alternative engine.py to compare, with the same GameState API')
+    parser.add_argument('--bench', action='store_true', help='also measure actions per second for every implementation')
+    parser.add_argument('--save', type=Path, metavar='PATH', help='write the first diverging script here in the shell protocol')
+    args = parser.parse_args()
+
+    names = args.impl or [name for name in available if name != 'reference']
+    runners = {'reference': GameStateRunner()}
+    runners.update((name, available[name]()) for name in names)
+    for path in args.engine:
+        runners[path.name] = GameStateRunner(load_engine(path))
+
+    scripts = [random_script(random.Random(seed), args.max_actions, args.colors)
+               for seed in range(args.seed, args.seed + args.scripts)]
+
+    divergence = None
+    for seed, script in enumerate(scripts, args.seed):
+        divergence = compare(script, runners, seed)
+        if divergence is not None:
+            print(divergence.describe())
+            if args.save is not None:
+                args.save.write_text(script.text())
+                print(f'Script saved to {args.save}')
+            break
+    else:
+        print(f"{len(scripts)} scripts, no divergence between {', '.join(runners)}")
+
+    if args.bench:
+        width = max(len(name) for name in runners)
+        for name, runner in runners.items():
+            result = benchmark(scripts, name, runner)
+            print(f'{name:<{width}}  {result.actions:>9} actions  {result.seconds:7.2f} s  {result.actions_per_second():>10.0f} actions/s')
+
+    sys.exit(1 if divergence is not None else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,12 @@
 import pygame
-import random
 
 from constants import *
 import helpers
 import engine
 import shell
 import data_manager
+import replay
+import fonts
 
 
 
@@ -25,247 +26,316 @@ class GameScreen:
 
         self._username = username
 
-        self._state = engine.GameState(self._rows, self._cols)
+        self._session, self._recorder = replay.new_session(self._rows, self._cols)
+        self._state = self._session.state()
+        # the engine collects the cells each call changes, so frames only redraw those
+        self._state.track_changes()
 
-        self._tick_count = 0
-        self._normal_tick_interval = INITIAL_TICK_INTERVAL
-        self._current_tick_interval = INITIAL_TICK_INTERVAL
+        self._show_matches = True
+        # cells currently in a match, redrawn on their own while the matches blink
+        self._matched_cells = set()
+        # whether the matches blinked since the last display()
+        self._matches_blinked = False
 
-        self._frame_count = 0
-        self._level = 1
+        self._next_faller = None
+        self._level = None
+        self._drawn_size = None
 
-        self._show_matches = True
+        # everything below depends on the window size and is rebuilt by _build_layout() when it changes
 
-        self._next_faller = self._create_random_faller()
+        # (jewel, cell state) -> pre-rendered cell, and the top left corner of every board cell; (None, 0) is an empty cell
+        self._sprites = {}
+        self._cell_positions = []
 
-        self._draw()
+        # background, board grid, empty boxes and labels, which the changing parts of the screen are drawn over
+        self._static_layer = None
+        self._layout_size = None
 
-    def _create_random_faller(self) -> engine.Faller:
-        '''Creates and spawns a new faller with random jewels in a valid column'''
-        game = self._state
-        board = game.board()
+        # areas of the window drawn over since the last display(); a full redraw pushes the whole window instead
+        self._dirty_rects = []
+        self._full_update = True
 
-        num_col_filled = 0
-        while True:
-            col = random.randint(1, self._cols)
-            if board[0][col - 1].jewel is None:
-                break
-            else:
-                num_col_filled += 1
-                
-                # when all the columns are filled, sets 'col' to an arbitrary number and let the game mechanics handle the error/gameover sequence
-                if num_col_filled == game.columns():
-                    col = 1
-                    break
-            
-        convert = {'0': 'R',
-                   '1': 'O',
-                   '2': 'Y',
-                   '3': 'G',
-                   '4': 'B',
-                   '5': 'P',
-                   '6': 'W'}
-        jewels = []
-        for _ in range(3):
-            rand = str(random.randint(0, 4))
-            jewels.append(convert[rand])
-
-        faller = engine.Faller(col, jewels)
-
-        return faller
+        self._draw()
         
     def display(self) -> None:
-        pygame.display.flip()
+        '''Draws everything that changed over the game frames since the last call and pushes it to the window,
+        the whole window only after a full redraw'''
+        # partial redraws only work on top of a full draw at the current window size
+        if self._surface.get_size() != self._drawn_size:
+            self._draw()
+        else:
+            if self._matches_blinked:
+                self._draw_cells(self._matched_cells)
+            self._draw_changes()
+
+        self._matches_blinked = False
+
+        if self._full_update:
+            pygame.display.flip()
+        elif self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+
+        self._full_update = False
+        self._dirty_rects.clear()
 
     def _draw(self) -> None:
-        '''Redraws the entire game screen and update the display'''
+        '''Redraws the entire game screen over its static layer, rebuilding the layer first if the window was resized'''
         surface = self._surface
 
-        surface.fill(BACKGROUND_COLOR)
+        if surface.get_size() != self._layout_size:
+            self._build_layout()
+
+        surface.blit(self._static_layer, (0, 0))
+        self._drawn_size = surface.get_size()
+
+        self._full_update = True
+        self._dirty_rects.clear()
+
+        # everything is redrawn, so the changes collected so far are already on screen
+        self._track_changes()
 
         self._draw_next_faller_view()
         self._draw_current_score()
         self._draw_total_score()
-        self._draw_time_label()
         self._draw_time()
         self._draw_level()
-        self._draw_username()
-        self._draw_leaderboard()
         self._draw_board()
 
-    def _str_to_color(self, color: str) -> pygame.Color:
-        '''Converts a jewel character code to its corresponding pygame Color'''
-        convert = {'R': pygame.Color(250, 90, 90),
-                   'O': pygame.Color(250, 160, 90),
-                   'Y': pygame.Color(250, 220, 90),
-                   'G': pygame.Color(60, 140, 60),
-                   'B': pygame.Color(90, 145, 210),
-                   'P': pygame.Color(110, 75, 200),
-                   'W': pygame.Color(200, 200, 200)}
-        
-        return convert[color]
-    
-    def _draw_board(self) -> None:
-        '''Renders the game board and its jewels, optionally hiding matched cells during blinking'''
-        surface = self._surface
-        
-        rows = self._rows
-        cols = self._cols
+    def _draw_changes(self) -> None:
+        '''Redraws only the cells and panels that changed since the last draw'''
+        new_faller = self._next_faller is not self._session.next_faller()
+        new_level = self._level != self._session.level()
+
+        changes = self._track_changes()
+
+        self._draw_cells(changes.rows_cols)
+
+        if changes.current_points_delta:
+            self._draw_current_score()
+        if changes.points_delta:
+            self._draw_total_score()
+        if new_faller:
+            self._draw_next_faller_view()
+        if new_level:
+            self._draw_level()
+        self._draw_time()
+
+    def _track_changes(self) -> engine.ChangeSet:
+        '''Takes the engine's change set and updates the matched cells and the panels it affects'''
+        changes = self._state.take_changes()
+
+        board = self._state.board()
+        for r, c in changes.rows_cols:
+            if board[r][c].state == 4:
+                self._matched_cells.add((r, c))
+            else:
+                self._matched_cells.discard((r, c))
+
+        self._next_faller = self._session.next_faller()
+        self._level = self._session.level()
+
+        return changes
+
+    def _build_layout(self) -> None:
+        '''Works out where everything goes at the current window size, then pre-renders the sprites and the static layer'''
+        winw, winh = self._surface.get_size()
+
         cell_size = self._cell_size
-        board_width = self._board_width
-        board_height = self._board_height
+        board_width, board_height = self._board_width, self._board_height
 
         left = 0.5 - board_width / 2
         top = 0.5 - board_height / 2
+        panel_left = left - (5/2 * cell_size)
 
-        winw, winh = surface.get_size()
+        self._board_rect = pygame.Rect(winw * left, winh * top, winw * board_width, winh * board_height)
 
-        board_rect = pygame.Rect(winw * left, winh * top, winw * board_width, winh * board_height)
-        pygame.draw.rect(surface, BOARD_COLOR, board_rect)
+        next_faller_left = left - (3/2 * cell_size)
+        self._next_faller_rect = pygame.Rect(winw * next_faller_left, winh * top, winw * cell_size, winh * (3 * cell_size))
+        self._next_faller_positions = [pygame.Rect(winw * next_faller_left, winh * (top + n * cell_size), 0, 0).topleft for n in range(3)]
 
-        board = self._state.board()
-        # shell.display_board(self._state)
-        for r in range(rows):
-            for c in range(cols):
-                x = left + c * cell_size
-                y = top + r * cell_size
-                cell_rect = pygame.Rect(winw * x, winh * y, winw * cell_size, winh * cell_size)
+        self._current_score_rect = pygame.Rect(winw * (left - 3 * cell_size), winh * (top + 7/2 * cell_size),
+                                               winw * (5/2 * cell_size), winh * cell_size)
+        self._total_score_rect = self._text_box(panel_left, top + (11/2 * cell_size))
+        self._time_rect = self._text_box(panel_left, top + (7 * cell_size))
+        self._level_rect = self._text_box(panel_left, top + (17/2 * cell_size))
 
-                pygame.draw.rect(surface, CELL_BORDER_COLOR, cell_rect, width=1)
+        self._text_size = int(winh * (5/8 * cell_size))
+        self._current_score_size = int(winh * (cell_size * 1.5))
+        self._text_margin = 0.005 * winw
 
-                cell = board[r][c]
+        self._build_sprites()
+        self._static_layer = self._render_static_layer()
+        self._layout_size = (winw, winh)
 
-                if not self._show_matches and cell.state == 4:   # match
-                    continue
+    def _text_box(self, left: float, top: float, width: float = None) -> pygame.Rect:
+        '''Returns the window rect of a line of text, given in fractions of the window size'''
+        winw, winh = self._surface.get_size()
 
-                if cell.jewel is not None:
-                    jewel_color = self._str_to_color(cell.jewel)
-                    pygame.draw.ellipse(surface, jewel_color, cell_rect)
+        if width is None:
+            width = 2 * self._cell_size
 
-                if cell.state == 2:    # landed
-                    pygame.draw.ellipse(surface, LANDED_COLOR, cell_rect, width=3)
+        return pygame.Rect(winw * left, winh * top, winw * width, winh * (1/2 * self._cell_size))
 
-    def _draw_next_faller_view(self) -> None:
+    def _build_sprites(self) -> None:
+        '''Pre-renders every jewel in every cell state at the current cell size and lays out the board cells'''
         surface = self._surface
+        winw, winh = surface.get_size()
 
         cell_size = self._cell_size
-        board_width, board_height = self._board_width, self._board_height
+        left = 0.5 - self._board_width / 2
+        top = 0.5 - self._board_height / 2
 
-        left = (0.5 - board_width / 2) - (3/2 * cell_size)
-        top = 0.5 - board_height / 2
-        
-        winw, winh = surface.get_size()
+        self._cell_positions = [
+            [pygame.Rect(winw * (left + c * cell_size), winh * (top + r * cell_size), 0, 0).topleft for c in range(self._cols)]
+            for r in range(self._rows)
+        ]
 
-        view_rect = pygame.Rect(winw * left, winh * top, winw * cell_size, winh * (3 * cell_size))
-        pygame.draw.rect(surface, BOARD_COLOR, view_rect)
+        rect = pygame.Rect(0, 0, winw * cell_size, winh * cell_size)
 
-        next_faller = self._next_faller
-        for n in range(3):
-            x = left
-            y = top + n * cell_size
-            cell_rect = pygame.Rect(winw * x, winh * y, winw * cell_size, winh * cell_size)
+        empty = pygame.Surface(rect.size).convert(surface)
+        empty.fill(BOARD_COLOR)
+        pygame.draw.rect(empty, CELL_BORDER_COLOR, rect, width=1)
 
-            pygame.draw.rect(surface, CELL_BORDER_COLOR, cell_rect, width=1)
+        sprites = {(None, 0): empty}
+        for jewel, color in JEWEL_DRAW_COLORS.items():
+            plain = empty.copy()
+            pygame.draw.ellipse(plain, color, rect)
+
+            landed = plain.copy()
+            pygame.draw.ellipse(landed, LANDED_COLOR, rect, width=3)
+
+            # falling, frozen and matched jewels look the same; only landed ones get a ring
+            for state in (1, 3, 4):
+                sprites[(jewel, state)] = plain
+            sprites[(jewel, 2)] = landed
+
+        self._sprites = sprites
+
+    def _render_static_layer(self) -> pygame.Surface:
+        '''Draws everything that stays the same for the whole game onto a new window-sized surface'''
+        layer = pygame.Surface(self._surface.get_size()).convert(self._surface)
+        layer.fill(BACKGROUND_COLOR)
+
+        # the empty board and the boxes the changing values are drawn in
+        pygame.draw.rect(layer, BOARD_COLOR, self._board_rect)
+        empty = self._sprites[(None, 0)]
+        layer.blits([(empty, position) for row in self._cell_positions for position in row], doreturn=False)
+
+        for rect in (self._next_faller_rect, self._current_score_rect, self._total_score_rect, self._time_rect, self._level_rect):
+            pygame.draw.rect(layer, BOARD_COLOR, rect)
 
-            jewel_color = self._str_to_color(next_faller.get_jewel(n).jewel)
-            pygame.draw.ellipse(surface, jewel_color, cell_rect)
-    
-    def _draw_current_score(self) -> None:
-        game = self._state
-        surface = self._surface
-        
         cell_size = self._cell_size
-        board_width, board_height = self._board_width, self._board_height
+        top = 0.5 - self._board_height / 2
+        panel_left = (0.5 - self._board_width / 2) - (5/2 * cell_size)
 
-        left = (0.5 - board_width / 2) - (3 * cell_size)
-        top = (0.5 - board_height / 2) + (7/2 * cell_size)
-        
-        winw, winh = surface.get_size()
+        self._blit_text(layer, self._text_box(panel_left, top + (5 * cell_size)), 'SCORE', align_right=True)
+        self._blit_text(layer, self._text_box(panel_left, top + (13/2 * cell_size)), 'TIME', align_right=True)
+        self._blit_text(layer, self._text_box(panel_left, top + (8 * cell_size)), 'LEVEL', align_right=True)
 
-        rect = pygame.Rect(winw * left, winh * top, winw * (5/2 * cell_size), winh * cell_size)
-        pygame.draw.rect(surface, BOARD_COLOR, rect)
+        self._draw_username(layer)
+        self._draw_leaderboard(layer)
 
-        current_score = game.current_points()
+        return layer
+    
+    def _draw_board(self) -> None:
+        '''Renders the jewels on the board, optionally hiding matched cells during blinking; empty cells are on the static layer'''
+        board = self._state.board()
+        self._draw_cells((r, c) for r in range(self._rows) for c in range(self._cols) if board[r][c].state != 0)
+
+    def _draw_cells(self, cells) -> None:
+        '''Redraws the given (row, col) cells of the board over whatever was drawn there before, in one blit batch'''
+        sprites = self._sprites
+        positions = self._cell_positions
+        empty = sprites[(None, 0)]
+        hide_matches = not self._show_matches
+
+        board = self._state.board()
+        blits = []
+        for r, c in cells:
+            cell = board[r][c]
+
+            if hide_matches and cell.state == 4:   # match
+                sprite = empty
+            else:
+                sprite = sprites[(cell.jewel, cell.state)]
+
+            blits.append((sprite, positions[r][c]))
+
+        self._dirty_rects += self._surface.blits(blits)
+
+    def _draw_next_faller_view(self) -> None:
+        sprites = self._sprites
+
+        next_faller = self._session.next_faller()
+        blits = [(sprites[(next_faller.get_jewel(n).jewel, 3)], position) for n, position in enumerate(self._next_faller_positions)]
+
+        self._dirty_rects += self._surface.blits(blits)
+    
+    def _draw_current_score(self) -> None:
+        rect = self._current_score_rect
+        self._clear_box(rect, align_right=True)
+
+        current_score = self._state.current_points()
 
         if current_score > 0:
-            font = pygame.font.Font(MICRO_FONT, int(winh * (cell_size * 1.5)))
-            text = font.render(str(current_score), True, FONT_COLOR)
+            text = fonts.render_text(MICRO_FONT, self._current_score_size, str(current_score), FONT_COLOR)
 
             text_rect = text.get_rect()
             text_rect.right = rect.right
             text_rect.centery = rect.centery
 
-            surface.blit(text, text_rect)
+            self._dirty_rects.append(self._surface.blit(text, text_rect))
 
-    def _draw_text(self, left: float, top: float, text: str, width: float = None, align_right: bool = False, draw_bounding_rect: bool = False) -> None:
-        surface = self._surface
-        winw, winh = surface.get_size()
-        
-        cell_size = self._cell_size
-
-        if width is None:
-            width = 2 * cell_size
-        
-        bounding_rect = pygame.Rect(winw * left, winh * top, winw * width, winh * (1/2 * cell_size))
-        if draw_bounding_rect:
-            pygame.draw.rect(surface, BOARD_COLOR, bounding_rect)
+    def _clear_box(self, rect: pygame.Rect, align_right: bool) -> None:
+        '''Restores a value box from the static layer, along with the background its previous text may have spilled onto'''
+        winw = self._surface.get_width()
 
-        font = pygame.font.Font(MICRO_FONT, int(winh * (5/8 * cell_size)))
-        font_text = font.render(text, True, FONT_COLOR)
-
-        text_rect = font_text.get_rect()
-
-        text_rect.centery = bounding_rect.centery
         if align_right:
-            text_rect.right = bounding_rect.right - (0.005 * winw)
+            spill = pygame.Rect(0, rect.top, rect.right, rect.height)
         else:
-            text_rect.left = bounding_rect.left + (0.005 * winw)
-            
-        surface.blit(font_text, text_rect)
+            spill = pygame.Rect(rect.left, rect.top, winw - rect.left, rect.height)
 
-    def _draw_total_score(self) -> None:
-        game = self._state
-        
-        cell_size = self._cell_size
-        board_width, board_height = self._board_width, self._board_height
-
-        left = (0.5 - board_width / 2) - (5/2 * cell_size)
-        label_top = (0.5 - board_height / 2) + (5 * cell_size)
-        score_top = label_top + (1/2 * cell_size)
+        self._surface.blit(self._static_layer, spill, spill)
+        self._dirty_rects.append(spill)
 
-        self._draw_text(left, label_top, 'SCORE', align_right=True)
+    def _draw_value(self, rect: pygame.Rect, text: str | tuple[str, ...]) -> None:
+        '''Redraws one of the right-aligned value boxes beside the board'''
+        self._clear_box(rect, align_right=True)
+        self._dirty_rects.append(self._blit_text(self._surface, rect, text, align_right=True))
 
-        total_score = game.total_points()
-        self._draw_text(left, score_top, str(total_score), align_right=True, draw_bounding_rect=True)
+    def _blit_text(self, surface: pygame.Surface, rect: pygame.Rect, text: str | tuple[str, ...], align_right: bool = False) -> pygame.Rect:
+        '''Draws a line of text in the panel font inside rect and returns the area it covers;
+        text given as a tuple of pieces is drawn piece by piece, so each piece is rendered and cached on its own'''
+        pieces = (text,) if isinstance(text, str) else text
+        rendered = [fonts.render_text(MICRO_FONT, self._text_size, piece, FONT_COLOR) for piece in pieces]
 
-    def _draw_time_label(self) -> None:
-        
-        left = (0.5 - self._board_width / 2) - (5/2 * self._cell_size)
-        top = (0.5 - self._board_height / 2) + (13/2 * self._cell_size)
+        text_rect = pygame.Rect(0, 0, sum(piece.get_width() for piece in rendered), max(piece.get_height() for piece in rendered))
 
-        self._draw_text(left, top, 'TIME', align_right=True)
+        text_rect.centery = rect.centery
+        if align_right:
+            text_rect.right = rect.right - self._text_margin
+        else:
+            text_rect.left = rect.left + self._text_margin
 
-    def _draw_time(self) -> None:
-        cell_size = self._cell_size
-        board_width, board_height = self._board_width, self._board_height
+        x = text_rect.left
+        for piece in rendered:
+            surface.blit(piece, (x, text_rect.top))
+            x += piece.get_width()
 
-        left = (0.5 - board_width / 2) - (5/2 * cell_size)
-        top = (0.5 - board_height / 2) + (7 * cell_size)
+        return text_rect
 
-        self._draw_text(left, top, helpers._frames_to_str(self._frame_count), align_right=True, draw_bounding_rect=True)
-    
-    def _draw_level(self) -> None:
-        cell_size = self._cell_size
-        board_width, board_height = self._board_width, self._board_height
+    def _draw_total_score(self) -> None:
+        self._draw_value(self._total_score_rect, str(self._state.total_points()))
 
-        left = (0.5 - board_width / 2) - (5/2 * cell_size)
-        label_top = (0.5 - board_height / 2) + (8 * cell_size)
-        level_top = label_top + (1/2 * cell_size)
+    def _draw_time(self) -> None:
+        # the frames after the seconds change every frame, so they are a piece of their own with only FRAME_RATE values to cache
+        time_str = helpers._frames_to_str(self._session.frame_count())
+        self._draw_value(self._time_rect, (time_str[:-3], time_str[-3:]))
 
-        self._draw_text(left, label_top, 'LEVEL', align_right=True)
-        self._draw_text(left, level_top, str(self._level), align_right=True, draw_bounding_rect=True)
+    def _draw_level(self) -> None:
+        self._draw_value(self._level_rect, str(self._session.level()))
 
-    def _draw_username(self) -> None:
+    def _draw_username(self, layer: pygame.Surface) -> None:
         cell_size = self._cell_size
         board_width, board_height = self._board_width, self._board_height
 
@@ -275,23 +345,23 @@ class GameScreen:
         if self._username:
             label_text_str = 'USERNAME'
 
-            user_top = label_top + (1/2 * cell_size)
-
-            self._draw_text(left, user_top, self._username, draw_bounding_rect=True)
+            user_rect = self._text_box(left, label_top + (1/2 * cell_size))
+            pygame.draw.rect(layer, BOARD_COLOR, user_rect)
+            self._blit_text(layer, user_rect, self._username)
 
         else:
             label_text_str = 'PRACTICE ROUND'
 
-        self._draw_text(left, label_top, label_text_str)
+        self._blit_text(layer, self._text_box(left, label_top), label_text_str)
 
-    def _draw_leaderboard(self) -> None:
+    def _draw_leaderboard(self, layer: pygame.Surface) -> None:
         cell_size = self._cell_size
         board_width, board_height = self._board_width, self._board_height
 
         left = (0.5 + board_width / 2) + (1/2 * cell_size)
         label_top = (0.5 - board_height / 2) + (3/2 * cell_size)
 
-        self._draw_text(left, label_top, 'LEADERBOARD')
+        self._blit_text(layer, self._text_box(left, label_top), 'LEADERBOARD')
 
         scores = data_manager.get_leaderboard()
 
@@ -304,78 +374,61 @@ class GameScreen:
             y = label_top + (1/2 * cell_size) + (i * row_height)
 
             rank_text = f'{entry['placement']}.'
-            self._draw_text(left, y, rank_text, width=rank_w)
+            self._blit_text(layer, self._text_box(left, y, width=rank_w), rank_text)
 
-            self._draw_text(left + rank_w, y, entry['username'], width=name_w)
+            self._blit_text(layer, self._text_box(left + rank_w, y, width=name_w), entry['username'])
 
             score_text = str(entry['score'])
-            self._draw_text(left + rank_w + name_w, y, score_text, align_right=True, width=score_w)
+            self._blit_text(layer, self._text_box(left + rank_w + name_w, y, width=score_w), score_text, align_right=True)
 
 
 
         
     def handle_events(self, events: list[pygame.event.Event]) -> None:
+        session = self._session
+
         for event in events:
             if event.type == pygame.KEYDOWN:
-                game = self._state
 
+                # the moved faller is drawn by the next display()
                 def safe_call(func) -> None:
                     try:
                         func()
-                        if game.faller() is not None and game.faller().state() == 2:
-                            self._tick_count = 0
                     except engine.IllegalAction as e:
                         print(e)
-                    finally:
-                        self._draw()
-                        pygame.display.flip()
 
                 if event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                    safe_call(game.move_faller_left)
+                    safe_call(session.move_faller_left)
                 elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                    safe_call(game.move_faller_right)
+                    safe_call(session.move_faller_right)
                 elif event.key == pygame.K_UP or event.key == pygame.K_w:
-                    safe_call(game.rotate_faller)
+                    safe_call(session.rotate_faller)
                 elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                    if game.faller() is not None and game.faller().state() == 1 and game.has_match() is False:
-                        self._current_tick_interval = FAST_TICK_INTERVAL
+                    session.start_fast_drop()
+                elif event.key == pygame.K_SPACE:
+                    safe_call(session.hard_drop)
             
             elif event.type == pygame.KEYUP:
                 if event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                    self._current_tick_interval = self._normal_tick_interval
+                    session.stop_fast_drop()
 
     def update(self) -> None:
-        self._tick_count += 1
-        self._frame_count += 1
-
-        self._draw_time()
-
-        self._level = (self._frame_count // 900) + 1
-        self._normal_tick_interval = max(MIN_NORMAL_TICK_INTERVAL, int(INITIAL_TICK_INTERVAL * (0.95)**(self._level - 1)))
-        
+        '''Advances the game one frame; drawing waits for display(), which may come only after several frames'''
         game = self._state
+
         if game.has_match():
-            self._draw_board()
             self._show_matches = not self._show_matches
-            tick_interval = self._normal_tick_interval
-        else:
-            tick_interval = self._current_tick_interval
+            self._matches_blinked = True
 
-        if self._tick_count >= tick_interval:
-            self._tick_count = 0
-
-            # if there is an active faller or if there is a match
-            if game.faller() is not None or game.has_match() is True:
-                game.tick()
-                self._show_matches = True
-            else:
-                game.spawn_faller(self._next_faller)
-                self._next_faller = self._create_random_faller()
-            
-            self._draw()
+        if self._session.update():
+            self._show_matches = True
         
         if game.game_over():
             raise GameOver()
 
     def final_score_time_level(self) -> tuple[int, int, int]:
-        return self._state.total_points(), self._frame_count, self._level
\ No newline at end of file
+        return self._state.total_points(), self._session.frame_count(), self._session.level()
+
+    def action_log(self) -> replay.ActionLog:
+        '''Returns the recording of this game, including its final score, time and level'''
+        return self._recorder.finish(*self.final_score_time_level())
\ No newline at end of file
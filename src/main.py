@@ -4,6 +4,9 @@ from start_screen import StartScreen, StartGame
 from game_screen import GameScreen, GameOver
 from end_screen import EndScreen, EndGame, RestartGame
 import data_manager
+import replay
+import fonts
+from scheduler import FixedStepScheduler
 
 
 
@@ -20,12 +23,14 @@ class ColumnsGame():
         pygame.init()
 
         try:
-            clock = pygame.time.Clock()
+            # the screens' update() is one game frame, run FRAME_RATE times a second whatever the render rate
+            scheduler = FixedStepScheduler()
+            scheduler.start()
 
             self._active_screen.display()
 
             while self._running:
-                clock.tick(FRAME_RATE)
+                scheduler.wait()
 
                 events = pygame.event.get()
                 for e in events:
@@ -38,20 +43,22 @@ class ColumnsGame():
                 try:
                     self._active_screen.handle_events(events)
 
-                    self._active_screen.update()
+                    for _ in range(scheduler.steps_due()):
+                        self._active_screen.update()
 
-                    self._active_screen.display()
+                    if scheduler.render_due():
+                        self._active_screen.display()
 
                 except StartGame as e:
                     self._current_user = e.username
                     self._active_screen = GameScreen(self._current_user)
-                    self._active_screen.display()
                 except GameOver:
                     score, time, level = self._active_screen.final_score_time_level()
                     username = self._current_user
                     
                     if username:
                         data_manager.save_new_entry(username, score, time, level)
+                        data_manager.save_replay(username, replay.encode(self._active_screen.action_log()))
 
                     self._active_screen = EndScreen(username, score, time, level)
                 except EndGame:
@@ -65,6 +72,12 @@ class ColumnsGame():
 
     def _resize_surface(self, size: tuple[int, int]) -> None:
         '''Resizes the game window to the given size.'''
+        surface = pygame.display.get_surface()
+        if surface is not None and surface.get_size() == tuple(size):
+            # setting the same mode again can blank the window under screens that only push what they redrew
+            return
+
+        fonts.clear()
         pygame.display.set_mode(size, pygame.RESIZABLE)
 
 if __name__ == '__main__':
@@ -0,0 +1,237 @@
+import argparse
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import engine
+from session import GameSession, INPUT_LEFT, INPUT_HARD_DROP
+
+MAGIC = b'CLMS'
+FORMAT_VERSION = 1
+
+# magic, format version, rows, cols, seed, final score, final time in frames, final level
+_HEADER = struct.Struct('<4sBBBQQIH')
+
+
+
+# Raised when a log cannot be decoded
+class InvalidActionLog(Exception):
+    pass
+
+# Raised when a replayed game stops following its log
+class ReplayMismatch(Exception):
+    pass
+
+
+
+@dataclass
+class ActionLog:
+    seed: int
+    rows: int
+    cols: int
+    fallers: list[tuple[int, str]] = field(default_factory=list)  # (1-based column, three jewels) in spawn order
+    events: list[tuple[int, int]] = field(default_factory=list)   # (frame, session INPUT_* event)
+    score: int = 0
+    frames: int = 0
+    level: int = 1
+
+
+
+@dataclass
+class ReplayResult:
+    score: int
+    frames: int
+    level: int
+
+    def matches(self, log: ActionLog) -> bool:
+        '''Returns True if the replay reproduced the final score, time and level stored in the log'''
+        return (self.score, self.frames, self.level) == (log.score, log.frames, log.level)
+
+
+
+class Recorder():
+    '''Session recorder that collects the fallers and player inputs of one game into an ActionLog'''
+    def __init__(self, seed: int, rows: int, cols: int) -> None:
+        self._log = ActionLog(seed, rows, cols)
+
+    def record_faller(self, col: int, jewels: str) -> None:
+        self._log.fallers.append((col, jewels))
+
+    def record_input(self, frame: int, event: int) -> None:
+        self._log.events.append((frame, event))
+
+    def finish(self, score: int, frames: int, level: int) -> ActionLog:
+        '''Stores the final result in the log and returns it'''
+        log = self._log
+        log.score, log.frames, log.level = score, frames, level
+        return log
+
+
+
+def new_session(rows: int = 13, cols: int = 6, seed: int = None) -> tuple[GameSession, Recorder]:
+    '''Returns a session seeded for replay together with the recorder listening to it'''
+    if seed is None:
+        seed = random.randrange(2**63)
+    recorder = Recorder(seed, rows, cols)
+    return GameSession(rows, cols, random.Random(seed), recorder=recorder), recorder
+
+
+def encode(log: ActionLog) -> bytes:
+    '''Packs a log as the fixed header, then the fallers, then the inputs with frames stored as varint deltas'''
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, log.rows, log.cols, log.seed, log.score, log.frames, log.level))
+
+    _write_varint(out, len(log.fallers))
+    for col, jewels in log.fallers:
+        out.append(col)
+        out += jewels.encode('ascii')
+
+    _write_varint(out, len(log.events))
+    last_frame = 0
+    for frame, event in log.events:
+        _write_varint(out, frame - last_frame)
+        out.append(event)
+        last_frame = frame
+
+    return bytes(out)
+
+
+def decode(data: bytes) -> ActionLog:
+    '''Unpacks a log written by encode(); raises InvalidActionLog if the data is not one'''
+    if len(data) < _HEADER.size:
+        raise InvalidActionLog('Log is shorter than its header.')
+
+    magic, version, rows, cols, seed, score, frames, level = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise InvalidActionLog('Not a Columns action log.')
+    if version != FORMAT_VERSION:
+        raise InvalidActionLog(f'Unsupported action log version {version}.')
+
+    log = ActionLog(seed, rows, cols, score=score, frames=frames, level=level)
+
+    try:
+        pos = _HEADER.size
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            log.fallers.append((data[pos], data[pos + 1:pos + 4].decode('ascii')))
+            pos += 4
+
+        count, pos = _read_varint(data, pos)
+        frame = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            frame += delta
+            log.events.append((frame, data[pos]))
+            pos += 1
+    except (IndexError, UnicodeDecodeError) as e:
+        raise InvalidActionLog('Log is truncated or corrupt.') from e
+
+    return log
+
+
+def play(log: ActionLog) -> ReplayResult:
+    '''Re-drives the logged game headlessly as fast as possible; raises ReplayMismatch if it diverges from the log'''
+    session = GameSession(log.rows, log.cols, random.Random(log.seed), recorder=_FallerCheck(log))
+    game = session.state()
+
+    events = log.events
+    i = 0
+
+    # one iteration per frame, in the same order as the game loop: inputs first, then the update
+    while not game.game_over():
+        frame = session.frame_count()
+        if frame >= log.frames:
+            break
+
+        while i < len(events) and events[i][0] == frame:
+            event = events[i][1]
+            if not INPUT_LEFT <= event <= INPUT_HARD_DROP:
+                raise ReplayMismatch(f'Unknown input {event} at frame {frame}.')
+            try:
+                session.apply_input(event)
+            except engine.IllegalAction:
+                pass
+            i += 1
+
+        if i < len(events) and events[i][0] < frame:
+            raise ReplayMismatch(f'Inputs are out of order at frame {events[i][0]}.')
+
+        session.update()
+
+    return ReplayResult(game.total_points(), session.frame_count(), session.level())
+
+
+def verify(log: ActionLog) -> bool:
+    '''Returns True if replaying the log reproduces its final score, time and level'''
+    try:
+        return play(log).matches(log)
+    except ReplayMismatch:
+        return False
+
+
+
+class _FallerCheck():
+    '''Recorder used during replay that checks every new faller against the logged faller sequence'''
+    def __init__(self, log: ActionLog) -> None:
+        self._fallers = log.fallers
+        self._n = 0
+
+    def record_faller(self, col: int, jewels: str) -> None:
+        n = self._n
+        if n < len(self._fallers) and self._fallers[n] != (col, jewels):
+            raise ReplayMismatch(f'Faller #{n + 1} is {col} {jewels}, but the log has {self._fallers[n]}.')
+        self._n += 1
+
+    def record_input(self, frame: int, event: int) -> None:
+        pass
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replays recorded Columns games headlessly and checks their results.')
+    parser.add_argument('logs', nargs='+', type=Path)
+    args = parser.parse_args()
+
+    failed = 0
+    start = time.perf_counter()
+
+    for path in args.logs:
+        try:
+            log = decode(path.read_bytes())
+            result = play(log)
+        except (InvalidActionLog, ReplayMismatch) as e:
+            print(f'{path}: FAILED ({e})')
+            failed += 1
+            continue
+
+        status = 'OK' if result.matches(log) else 'MISMATCH'
+        if status != 'OK':
+            failed += 1
+        print(f'{path}: {status} score {result.score} time {result.frames} level {result.level} '
+              f'(logged {log.score} / {log.frames} / {log.level})')
+
+    print(f'{len(args.logs)} logs, {failed} failed, {time.perf_counter() - start:.2f} s')
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
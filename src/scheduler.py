@@ -0,0 +1,72 @@
+import time
+
+from timing import *
+
+
+
+class FixedStepScheduler():
+    '''Paces a game loop: the game advances in fixed steps of wall-clock time, and frames are drawn at their own rate.
+
+    Steps are counted from a monotonic clock, so a slow frame is made up for by running the missed steps back to
+    back, up to max_catch_up at a time. Drawing never runs more than once per render interval, however many steps
+    ran in between. Has no pygame dependency.
+    '''
+    def __init__(self, step_rate: float = FRAME_RATE, render_rate: float = RENDER_RATE,
+                 max_catch_up: int = MAX_CATCH_UP_FRAMES, clock = time.perf_counter, sleep = time.sleep) -> None:
+        self._step_interval = 1 / step_rate
+        self._render_interval = 1 / render_rate
+        self._max_catch_up = max_catch_up
+
+        # perf_counter is monotonic and, unlike time.monotonic on some platforms, finer than a frame
+        self._clock = clock
+        self._sleep = sleep
+
+        self._next_step = None
+        self._next_render = None
+        self._dropped_steps = 0
+
+    def start(self) -> None:
+        '''Starts counting; the first step is due one step interval from now and the first frame right away'''
+        now = self._clock()
+        self._next_step = now + self._step_interval
+        self._next_render = now
+
+    def dropped_steps(self) -> int:
+        '''Returns the number of steps skipped because the loop fell further behind than it may catch up'''
+        return self._dropped_steps
+
+    def steps_due(self) -> int:
+        '''Returns the number of steps to run now, and counts them as run'''
+        now = self._clock()
+        if now < self._next_step:
+            return 0
+
+        steps = int((now - self._next_step) / self._step_interval) + 1
+        if steps > self._max_catch_up:
+            self._dropped_steps += steps - self._max_catch_up
+            steps = self._max_catch_up
+            # the rest is given up on, so the game carries on at normal speed from here instead of racing
+            self._next_step = now + self._step_interval
+        else:
+            self._next_step += steps * self._step_interval
+
+        return steps
+
+    def render_due(self) -> bool:
+        '''Returns True if a frame should be drawn now, and counts it as drawn'''
+        now = self._clock()
+        if now < self._next_render:
+            return False
+
+        self._next_render += self._render_interval
+        if self._next_render <= now:
+            # frames missed while the loop was busy are skipped rather than drawn back to back
+            self._next_render = now + self._render_interval
+
+        return True
+
+    def wait(self) -> None:
+        '''Sleeps until the next step or frame is due'''
+        delay = min(self._next_step, self._next_render) - self._clock()
+        if delay > 0:
+            self._sleep(delay)
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+
+import engine
+import shell
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7613
+
+# seconds a client may stay silent before its session is closed
+DEFAULT_IDLE_TIMEOUT = 300
+
+# longest line a client may send, and the largest board it may ask for
+MAX_LINE_LENGTH = 4096
+MAX_BOARD_SIZE = 256
+
+# the engine gives every distinct jewel a code for the life of the process, so clients only get the printable
+# ASCII characters; otherwise one session could use up the codes and break spawning for every later one
+JEWELS = frozenset(chr(c) for c in range(ord('!'), ord('~') + 1))
+
+
+
+# Raised when a client sends something the shell protocol does not allow
+class ProtocolError(Exception):
+    pass
+
+
+
+class GameServer():
+    '''Hosts one GameState per connection, each speaking the shell.run_game line protocol.
+
+    A client sends the rows, the columns and the initial field, then one action per line, and gets every board
+    back in the display_board format, the same as piping the lines into shell.py. Frames are only sent as fast
+    as the client reads them, and sessions that stop sending or reading for longer than the idle timeout are closed.
+    '''
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        self._idle_timeout = idle_timeout
+        self._sessions = 0
+        self._games_played = 0
+
+    def sessions(self) -> int:
+        '''Returns the number of connected sessions'''
+        return self._sessions
+
+    def games_played(self) -> int:
+        return self._games_played
+
+    async def start_tcp(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+        return await asyncio.start_server(self._handle, host, port, limit=MAX_LINE_LENGTH)
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        return await asyncio.start_unix_server(self._handle, path, limit=MAX_LINE_LENGTH)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._sessions += 1
+        try:
+            await self._play(reader, writer)
+            await self._drain(writer)
+            await self._finish(reader, writer)
+        except (ProtocolError, ValueError, engine.InvalidBoardRows, engine.InvalidBoardColumns,
+                engine.InvalidInitialFieldDimensions, engine.InvalidFaller) as e:
+            # ValueError covers lines that are too long, not UTF-8 or not numbers where numbers are expected
+            writer.write(f'ERROR {e}\n'.encode('utf-8'))
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            self._sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''Plays one game with the client, the same way shell.run_game plays one on stdin and stdout'''
+        rows = int(await self._expect_line(reader))
+        cols = int(await self._expect_line(reader))
+        if rows > MAX_BOARD_SIZE or cols > MAX_BOARD_SIZE:
+            raise ProtocolError(f'Boards can be at most {MAX_BOARD_SIZE} by {MAX_BOARD_SIZE}.')
+
+        game = engine.GameState(rows, cols)
+        if await self._expect_line(reader) == 'CONTENTS':
+            data = [await self._expect_line(reader) for _ in range(rows)]
+            self._check_jewels(''.join(data).replace(' ', ''))
+            game.load(data)
+
+        self._games_played += 1
+
+        # the transport may keep a reference to what it has not sent yet, so each frame is copied out of the buffer
+        frames = shell.FrameBuffer(rows, cols)
+        frame = bytes(frames.render(game))
+
+        # by default drain() only waits once about 64 KiB are queued, hundreds of frames on small boards;
+        # with the limit at one frame, a client that stops reading holds up its session after one more frame
+        writer.transport.set_write_buffer_limits(high=len(frame))
+        writer.write(frame)
+
+        while True:
+            # waits while more than a frame is queued beyond what the operating system's socket buffer holds
+            await self._drain(writer)
+
+            line = await self._read_line(reader)
+            if line is None:
+                break
+
+            action = line.strip()
+            if action == 'Q':
+                game.end()
+                break
+
+            if action.startswith('F'):
+                self._check_jewels(''.join(action.split()[2:]))
+
+            # illegal actions are ignored, and the board is sent again as it was
+            game.apply_actions((action,))
+
+            writer.write(bytes(frames.render(game)))
+
+            if game.game_over():
+                writer.write(b'GAME OVER\n')
+                break
+
+    def _check_jewels(self, jewels: str) -> None:
+        '''Raises ProtocolError if any of the jewels is not a printable ASCII character'''
+        for jewel in jewels:
+            if jewel not in JEWELS:
+                raise ProtocolError(f'Jewels must be printable ASCII characters, got {jewel!r}.')
+
+    async def _finish(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''Ends a finished session without losing frames the client has not read yet'''
+        if not writer.can_write_eof():
+            return
+        writer.write_eof()
+
+        # closing while the client's remaining actions are still unread would reset the connection and
+        # could drop the last frames, so the rest of its input is read and thrown away first
+        async def discard() -> None:
+            while await reader.read(MAX_LINE_LENGTH):
+                pass
+
+        await asyncio.wait_for(discard(), self._idle_timeout)
+
+    async def _drain(self, writer: asyncio.StreamWriter) -> None:
+        '''Waits until no more than the transport's high-water mark, one frame, is left unsent;
+        raises TimeoutError if the client stops reading for too long'''
+        await asyncio.wait_for(writer.drain(), self._idle_timeout)
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> str | None:
+        '''Returns the next line without its line break, or None at the end of the stream;
+        raises TimeoutError if the client stays silent too long'''
+        line = await asyncio.wait_for(reader.readline(), self._idle_timeout)
+        if not line:
+            return None
+        return line.rstrip(b'\r\n').decode('utf-8')
+
+    async def _expect_line(self, reader: asyncio.StreamReader) -> str:
+        line = await self._read_line(reader)
+        if line is None:
+            raise ProtocolError('Connection closed before the game started.')
+        return line
+
+
+
+async def serve(server: GameServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_path: str = None) -> None:
+    '''Serves games until cancelled, on a Unix socket if unix_path is given and on TCP otherwise'''
+    if unix_path is not None:
+        listener = await server.start_unix(unix_path)
+    else:
+        listener = await server.start_tcp(host, port)
+
+    async with listener:
+        await listener.serve_forever()
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Hosts Columns games that speak the shell.py line protocol over sockets.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT, help='seconds before a silent session is closed')
+    args = parser.parse_args()
+
+    server = GameServer(args.idle_timeout)
+    where = args.unix if args.unix is not None else f'{args.host}:{args.port}'
+    print(f'Serving Columns on {where}')
+
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print(f'Stopped after {server.games_played()} games')
+
+if __name__ == '__main__':
+    main()
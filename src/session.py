@@ -0,0 +1,169 @@
+import random
+
+import engine
+from timing import *
+
+# jewel colors in the order the random faller picks them from; the game uses the first five
+JEWEL_COLORS = ['R', 'O', 'Y', 'G', 'B', 'P', 'W']
+DEFAULT_NUM_COLORS = 5
+
+# player inputs as they are passed to a session recorder
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_ROTATE = 3
+INPUT_FAST_DROP_PRESS = 4
+INPUT_FAST_DROP_RELEASE = 5
+INPUT_HARD_DROP = 6
+
+
+
+class GameSession():
+    '''Drives a GameState one frame at a time with the game's tick timing and random fallers; has no pygame dependency'''
+    def __init__(self, rows: int = 13, cols: int = 6, rng: random.Random = None,
+                 num_colors: int = DEFAULT_NUM_COLORS, initial_tick_interval: int = INITIAL_TICK_INTERVAL,
+                 recorder = None) -> None:
+        self._rows = rows
+        self._cols = cols
+
+        # optional object with record_faller(col, jewels) and record_input(frame, event), such as replay.Recorder
+        self._recorder = recorder
+
+        # the random module itself works as the default generator, so unseeded games behave as before
+        self._rng = random if rng is None else rng
+        self._num_colors = num_colors
+
+        self._state = engine.GameState(rows, cols)
+
+        self._tick_count = 0
+        self._initial_tick_interval = initial_tick_interval
+        self._normal_tick_interval = initial_tick_interval
+        self._current_tick_interval = initial_tick_interval
+
+        self._frame_count = 0
+        self._level = 1
+
+        self._next_faller = self._create_random_faller()
+
+    def state(self) -> engine.GameState:
+        return self._state
+
+    def next_faller(self) -> engine.Faller:
+        return self._next_faller
+
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    def level(self) -> int:
+        return self._level
+
+    def _create_random_faller(self) -> engine.Faller:
+        '''Creates a new faller with random jewels in a column that is not full'''
+        game = self._state
+        rng = self._rng
+        board = game.board()
+
+        num_col_filled = 0
+        while True:
+            col = rng.randint(1, self._cols)
+            if board.column_height(col - 1) < self._rows:
+                break
+            else:
+                num_col_filled += 1
+
+                # when all the columns are filled, sets 'col' to an arbitrary number and let the game mechanics handle the error/gameover sequence
+                if num_col_filled == game.columns():
+                    col = 1
+                    break
+
+        jewels = []
+        for _ in range(3):
+            jewels.append(JEWEL_COLORS[rng.randint(0, self._num_colors - 1)])
+
+        if self._recorder is not None:
+            self._recorder.record_faller(col, ''.join(jewels))
+
+        return engine.Faller(col, jewels)
+
+    def apply_input(self, event: int) -> None:
+        '''Applies one of the INPUT_* player inputs'''
+        inputs = {
+            INPUT_LEFT: self.move_faller_left,
+            INPUT_RIGHT: self.move_faller_right,
+            INPUT_ROTATE: self.rotate_faller,
+            INPUT_FAST_DROP_PRESS: self.start_fast_drop,
+            INPUT_FAST_DROP_RELEASE: self.stop_fast_drop,
+            INPUT_HARD_DROP: self.hard_drop
+        }
+        inputs[event]()
+
+    def _record_input(self, event: int) -> None:
+        if self._recorder is not None:
+            self._recorder.record_input(self._frame_count, event)
+
+    def move_faller_left(self) -> None:
+        self._record_input(INPUT_LEFT)
+        self._player_action(self._state.move_faller_left)
+
+    def move_faller_right(self) -> None:
+        self._record_input(INPUT_RIGHT)
+        self._player_action(self._state.move_faller_right)
+
+    def rotate_faller(self) -> None:
+        self._record_input(INPUT_ROTATE)
+        self._player_action(self._state.rotate_faller)
+
+    def hard_drop(self) -> None:
+        self._record_input(INPUT_HARD_DROP)
+        self._player_action(self._state.hard_drop)
+
+    def _player_action(self, action) -> None:
+        '''Runs a player move; a faller that lands because of it gets a full tick before freezing'''
+        game = self._state
+
+        action()
+        if game.faller() is not None and game.faller().state() == 2:
+            self._tick_count = 0
+
+    def start_fast_drop(self) -> None:
+        self._record_input(INPUT_FAST_DROP_PRESS)
+
+        game = self._state
+        if game.faller() is not None and game.faller().state() == 1 and game.has_match() is False:
+            self._current_tick_interval = FAST_TICK_INTERVAL
+
+    def stop_fast_drop(self) -> None:
+        self._record_input(INPUT_FAST_DROP_RELEASE)
+
+        self._current_tick_interval = self._normal_tick_interval
+
+    def update(self) -> bool:
+        '''Advances the session one frame; returns True if the game ticked or spawned a faller'''
+        self._tick_count += 1
+        self._frame_count += 1
+
+        self._level = (self._frame_count // FRAMES_PER_LEVEL) + 1
+        self._normal_tick_interval = max(MIN_NORMAL_TICK_INTERVAL, int(self._initial_tick_interval * (0.95)**(self._level - 1)))
+
+        game = self._state
+        if game.has_match():
+            tick_interval = self._normal_tick_interval
+        else:
+            tick_interval = self._current_tick_interval
+
+        if self._tick_count < tick_interval:
+            return False
+
+        self._tick_count = 0
+
+        # if there is an active faller or if there is a match
+        if game.faller() is not None or game.has_match() is True:
+            game.tick()
+        else:
+            try:
+                game.spawn_faller(self._next_faller)
+            except engine.IllegalAction:
+                # the spawn column filled up after the faller was picked; spawn_faller has ended the game
+                return True
+            self._next_faller = self._create_random_faller()
+
+        return True
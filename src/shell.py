@@ -1,5 +1,12 @@
+import argparse
+import sys
+
 import engine
 
+# characters on either side of a jewel for each cell state, as in _translate_cell
+_LEFT_MARKS = bytes.maketrans(b'\x00\x01\x02\x03\x04', b' [| *')
+_RIGHT_MARKS = bytes.maketrans(b'\x00\x01\x02\x03\x04', b' ]| *')
+
 def get_rows_cols() -> tuple[int, int]:
     rows = int(input())
     cols = int(input())
@@ -22,17 +29,78 @@ def get_action() -> str:
     return action
 
 def display_board(game: engine.GameState) -> None:
-    rows = game.rows()
     columns = game.columns()
-    board = game.board()
 
-    for r in range(rows):
-        print('|', end='')
-        for c in range(columns):
-            print(_translate_cell(board[r][c]), end='')
-        print('|')
+    lines = board_lines(game.board())
+    lines.append(f" {'---' * columns} ")
+
+    print('\n'.join(lines))
+
+def board_lines(board) -> list[str]:
+    '''Returns the rows of a row-major board of Cells as display_board prints them, without the bottom line'''
+    return ['|' + ''.join(_translate_cell(cell) for cell in row) + '|' for row in board]
+
+class FrameBuffer():
+    '''Renders boards in the display_board format into one preallocated byte buffer, a column at a time'''
+    def __init__(self, rows: int, columns: int) -> None:
+        self._rows = rows
+        self._columns = columns
+
+        # each row is '|', three characters per cell, '|' and a newline
+        self._width = 3 * columns + 3
+        frame = bytearray(b'|' + b' ' * (3 * columns) + b'|\n') * rows
+        frame += f" {'---' * columns} \n".encode('ascii')
+        self._frame = frame
+
+        # jewel code -> jewel character; 0 marks codes not looked up yet
+        self._letters = bytearray(256)
+        self._letters[0] = ord(' ')
+
+    def render(self, game: engine.GameState) -> bytearray:
+        '''Returns the buffer holding the game's board; it is overwritten by the next call.
+        Boards with jewels that are more than one byte in UTF-8 are rendered through board_lines() instead'''
+        frame = self._frame
+        board = game.board()
+        width = self._width
+        end = width * self._rows
+
+        for c in range(self._columns):
+            codes = board.column_codes(c)
+            states = board.column_states(c)
+
+            letters = codes.translate(self._letters)
+            if 0 in letters:
+                if not self._learn_letters(codes):
+                    return self._render_lines(game)
+                letters = codes.translate(self._letters)
+
+            x = 3 * c
+            frame[x + 1:end:width] = states.translate(_LEFT_MARKS)
+            frame[x + 2:end:width] = letters
+            frame[x + 3:end:width] = states.translate(_RIGHT_MARKS)
+
+        return frame
+
+    def _learn_letters(self, codes: bytes) -> bool:
+        '''Adds the characters of jewel codes seen for the first time to the translation table;
+        returns False if one of them is not a one-byte character and cannot be added'''
+        learned = True
+        for code in set(codes):
+            if not self._letters[code]:
+                letter = engine.code_jewel(code).encode('utf-8')
+                if len(letter) == 1:
+                    self._letters[code] = letter[0]
+                else:
+                    learned = False
+        return learned
+
+    def _render_lines(self, game: engine.GameState) -> bytearray:
+        '''Renders the board the same way display_board prints it, into a new buffer'''
+        lines = board_lines(game.board())
+        lines.append(f" {'---' * self._columns} ")
+        return bytearray(('\n'.join(lines) + '\n').encode('utf-8'))
+
 
-    print(f" {'---' * columns} ")
 
 def _translate_cell(cell: engine.Cell) -> str:
     '''Converts a Cell into its display-string form based on its state.'''
@@ -63,26 +131,13 @@ def run_game() -> None:
 
     while True:
         action = get_action()
-        
-        try:
-            if action == '':
-                game.tick()
-            elif action.startswith('F'):
-                col = int(action.split()[1])
-                jewels = action.split()[2:]
-                faller = engine.Faller(col, jewels)
-                game.spawn_faller(faller)
-            elif action == 'R':
-                game.rotate_faller()
-            elif action == '<':
-                game.move_faller_left()
-            elif action == '>':
-                game.move_faller_right()
-            elif action == 'Q':
-                game.end()
-                break
-        except engine.IllegalAction:
-            pass
+
+        if action == 'Q':
+            game.end()
+            break
+
+        # illegal actions are ignored, and the board is shown again as it was
+        game.apply_actions([action])
 
         display_board(game)
 
@@ -90,5 +145,76 @@ def run_game() -> None:
             print('GAME OVER')
             break
 
+def run_batch(stream = None, out = None, every: int = 1) -> None:
+    '''Plays the same protocol as run_game from a byte stream, writing every nth frame through one buffer;
+    every=0 writes only the final frame, which is always written'''
+    stream = sys.stdin.buffer if stream is None else stream
+    out = sys.stdout.buffer if out is None else out
+
+    lines = (line.rstrip(b'\r\n').decode('utf-8') for line in stream)
+
+    rows = int(next(lines))
+    cols = int(next(lines))
+    game = engine.GameState(rows, cols)
+
+    if next(lines) == 'CONTENTS':
+        game.load([next(lines) for _ in range(rows)])
+
+    frames = FrameBuffer(rows, cols)
+    out.write(frames.render(game))
+    written = True
+
+    moves = {
+        '': game.tick,
+        'R': game.try_rotate_faller,
+        '<': game.try_move_faller_left,
+        '>': game.try_move_faller_right
+    }
+
+    frame_num = 0
+    action = None
+    for line in lines:
+        action = line.strip()
+
+        if action == 'Q':
+            game.end()
+            break
+
+        # illegal actions are ignored, the same as in run_game
+        move = moves.get(action)
+        if move is not None:
+            move()
+        elif action.startswith('F'):
+            game.apply_actions((action,))
+
+        frame_num += 1
+        written = every > 0 and frame_num % every == 0
+        if written:
+            out.write(frames.render(game))
+
+        if game.game_over():
+            break
+
+    if not written:
+        out.write(frames.render(game))
+    if game.game_over() and action != 'Q':
+        out.write(b'GAME OVER\n')
+
+    out.flush()
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Plays Columns with the line protocol on stdin and boards on stdout.')
+    parser.add_argument('--batch', action='store_true', help='stream stdin and stdout through buffers for scripted input')
+    parser.add_argument('--every', type=int, default=1, metavar='N', help='with --batch, only write every Nth frame')
+    parser.add_argument('--final', action='store_true', help='with --batch, only write the final frame')
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(every=0 if args.final else args.every)
+    else:
+        run_game()
+
 if __name__ == '__main__':
-    run_game()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,170 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import engine
+from bot import PlacementBot
+from session import GameSession, JEWEL_COLORS, DEFAULT_NUM_COLORS
+from timing import *
+
+# games that somehow never end are stopped after an hour of game time
+DEFAULT_MAX_FRAMES = FRAME_RATE * 60 * 60
+
+# chance per frame that the random policy presses a key
+RANDOM_INPUT_RATE = 0.2
+
+# boards the bot policy may score per decision; it searches by count instead of by time so that results do not depend
+# on how fast or busy the machine is, and about this many fit in the game's 20 ms budget
+BOT_MAX_EVALUATIONS = 300
+
+
+
+@dataclass
+class GameResult:
+    seed: int
+    score: int
+    level: int
+    frames: int
+    fallers: int
+    max_cascade: int
+    finished: bool
+
+
+
+@dataclass
+class SimulationReport:
+    results: list[GameResult]
+    seconds: float
+
+    def games_per_second(self) -> float:
+        return len(self.results) / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        '''Returns the aggregate score, level and cascade statistics as printable lines'''
+        results = self.results
+        n = len(results)
+        if n == 0:
+            return 'No games played.'
+
+        scores = sorted(result.score for result in results)
+        levels = [result.level for result in results]
+        cascades = [result.max_cascade for result in results]
+        unfinished = sum(1 for result in results if not result.finished)
+
+        lines = [
+            f'Games:        {n} ({unfinished} stopped at the frame limit)',
+            f'Score:        mean {sum(scores) / n:.1f}, median {scores[n // 2]}, min {scores[0]}, max {scores[-1]}',
+            f'Level:        mean {sum(levels) / n:.2f}, max {max(levels)}',
+            f'Cascade:      mean max depth {sum(cascades) / n:.2f}, deepest {max(cascades)}',
+            f'Fallers:      mean {sum(result.fallers for result in results) / n:.1f}',
+            f'Throughput:   {self.games_per_second():.1f} games/s ({self.seconds:.2f} s)'
+        ]
+        return '\n'.join(lines)
+
+
+
+def play_game(seed: int, rows: int = 13, cols: int = 6, num_colors: int = DEFAULT_NUM_COLORS,
+              initial_tick_interval: int = INITIAL_TICK_INTERVAL, policy: str = 'idle',
+              max_frames: int = DEFAULT_MAX_FRAMES) -> GameResult:
+    '''Plays one complete game headlessly; the same seed always plays the same game'''
+    session = GameSession(rows, cols, random.Random(seed), num_colors, initial_tick_interval)
+    game = session.state()
+
+    input_rng = random.Random(f'{seed}-input')
+    inputs = [
+        session.move_faller_left,
+        session.move_faller_right,
+        session.rotate_faller,
+        session.start_fast_drop,
+        session.stop_fast_drop
+    ]
+
+    bot = PlacementBot(time_budget=None, max_evaluations=BOT_MAX_EVALUATIONS) if policy == 'bot' else None
+    planned = None
+
+    fallers = 0
+    cascade = 0
+    max_cascade = 0
+
+    while not game.game_over() and session.frame_count() < max_frames:
+        if policy == 'random' and input_rng.random() < RANDOM_INPUT_RATE:
+            try:
+                input_rng.choice(inputs)()
+            except engine.IllegalAction:
+                pass
+        elif bot is not None and game.faller() is not None and game.faller() is not planned and not game.has_match():
+            _play_bot_plan(session, bot)
+            planned = game.faller()
+
+        had_faller = game.faller() is not None
+        clearing = game.has_match()
+
+        if not session.update():
+            continue
+
+        if clearing:
+            # each tick that clears matches is one more step of the chain reaction
+            cascade += 1
+            max_cascade = max(max_cascade, cascade)
+            if not game.has_match():
+                cascade = 0
+        elif not had_faller and game.faller() is not None:
+            fallers += 1
+
+    return GameResult(seed, game.total_points(), session.level(),
+                      session.frame_count(), fallers, max_cascade, game.game_over())
+
+
+def _play_bot_plan(session: GameSession, bot: PlacementBot) -> None:
+    '''Moves the newly spawned faller where the bot wants it and holds fast drop'''
+    plan = bot.choose(session.state(), next_faller=session.next_faller())
+    if plan is not None:
+        moves = {'R': session.rotate_faller, '<': session.move_faller_left, '>': session.move_faller_right}
+        for action in plan.actions:
+            moves[action]()
+    session.start_fast_drop()
+
+
+def simulate(games: int, seed: int = 0, workers: int = None, **options) -> SimulationReport:
+    '''Plays games with consecutive seeds starting at seed across a process pool; options go to play_game'''
+    seeds = range(seed, seed + games)
+    play = partial(play_game, **options)
+
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = [play(s) for s in seeds]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, games // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(play, seeds, chunksize=chunksize))
+
+    return SimulationReport(results, time.perf_counter() - start)
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Plays complete Columns games without a window and reports the results.')
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game; game i uses seed + i')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--rows', type=int, default=13)
+    parser.add_argument('--cols', type=int, default=6)
+    parser.add_argument('--colors', type=int, default=DEFAULT_NUM_COLORS, choices=range(1, len(JEWEL_COLORS) + 1))
+    parser.add_argument('--tick-interval', type=int, default=INITIAL_TICK_INTERVAL, help='initial frames per tick')
+    parser.add_argument('--policy', choices=['idle', 'random', 'bot'], default='idle',
+                        help='idle lets every faller drop where it spawns; random presses random keys; bot plays with PlacementBot')
+    parser.add_argument('--max-frames', type=int, default=DEFAULT_MAX_FRAMES)
+    args = parser.parse_args()
+
+    report = simulate(args.games, args.seed, args.workers, rows=args.rows, cols=args.cols, num_colors=args.colors,
+                      initial_tick_interval=args.tick_interval, policy=args.policy, max_frames=args.max_frames)
+    print(report.summary())
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ import pygame
 
 from constants import *
 import data_manager
+import fonts
 
 class StartGame(Exception):
     def __init__(self, username: str):
@@ -23,11 +24,49 @@ class StartScreen():
 
         self._yes_no = True
 
+        # window size and prompt contents last drawn, so display() only redraws and pushes what changed
+        self._drawn_size = None
+        self._drawn_prompt = None
+
+        # background and title for the window size last drawn, and the area the prompts are drawn in
+        self._static_layer = None
+        self._prompt_rect = None
+
     def display(self) -> None:
-        self._surface.fill(BACKGROUND_COLOR)
+        '''Redraws the prompt below the title when it changed, and the whole window after a resize'''
+        surface = self._surface
+
+        prompt = (self._state, self._username_text, self._yes_no)
+        if surface.get_size() == self._drawn_size and prompt == self._drawn_prompt:
+            return
+
+        if surface.get_size() != self._drawn_size:
+            self._build_layout()
+            surface.blit(self._static_layer, (0, 0))
+            self._draw_prompt()
+            pygame.display.flip()
+        else:
+            surface.blit(self._static_layer, self._prompt_rect, self._prompt_rect)
+            self._draw_prompt()
+            pygame.display.update(self._prompt_rect)
+
+        self._drawn_size = surface.get_size()
+        self._drawn_prompt = prompt
+
+    def _build_layout(self) -> None:
+        '''Renders the background and title at the current window size'''
+        surface = self._surface
+        winw, winh = surface.get_size()
+
+        layer = pygame.Surface((winw, winh)).convert(surface)
+        layer.fill(BACKGROUND_COLOR)
+        self._draw_title(layer)
+        self._static_layer = layer
 
-        self._draw_title()
+        # every prompt is drawn from halfway down the window, under the title
+        self._prompt_rect = pygame.Rect(0, 0.5 * winh, winw, winh - int(0.5 * winh))
 
+    def _draw_prompt(self) -> None:
         state_methods = {
             0: self._draw_enter_to_start,
             1: self._draw_username_input,
@@ -39,14 +78,11 @@ class StartScreen():
         if method:
             method()
 
-        pygame.display.flip()
-
-    def _draw_text(self, top: float, text_str: str, font_size: float, font_style: str = MICRO_FONT, font_color: pygame.Color = FONT_COLOR) -> None:
-        surface = self._surface
+    def _draw_text(self, top: float, text_str: str, font_size: float, font_style: str = MICRO_FONT, font_color: pygame.Color = FONT_COLOR, surface: pygame.Surface = None) -> None:
+        surface = self._surface if surface is None else surface
         winw, winh = surface.get_size()
 
-        font = pygame.font.Font(font_style, int(font_size * winh))
-        text = font.render(text_str, True, font_color)
+        text = fonts.render_text(font_style, int(font_size * winh), text_str, font_color)
 
         text_rect = text.get_rect()
         text_rect.centerx = 0.5 * winw
@@ -54,8 +90,8 @@ class StartScreen():
 
         surface.blit(text, text_rect)
 
-    def _draw_title(self) -> None:
-        self._draw_text(0.1, 'COLUMNS', 0.3)
+    def _draw_title(self, layer: pygame.Surface) -> None:
+        self._draw_text(0.1, 'COLUMNS', 0.3, surface=layer)
 
     def _draw_enter_to_start(self) -> None:
         self._draw_text(0.5, 'PRESS [ENTER] TO START', 0.1)
@@ -78,11 +114,9 @@ class StartScreen():
         surface = self._surface
         winw, winh = surface.get_size()
 
-        font = pygame.font.Font(font_style, int(font_size * winh))
-        
         display_str = f'> {text_str} <' if is_selected else text_str
 
-        text = font.render(display_str, True, font_color)
+        text = fonts.render_text(font_style, int(font_size * winh), display_str, font_color)
         
         text_rect = text.get_rect()
         text_rect.centerx = (winw / 2) + (offset * winw)
@@ -0,0 +1,15 @@
+# frame and tick timing shared by the pygame screens and the headless tools, so it must not import pygame
+FRAME_RATE = 30
+
+INITIAL_TICK_INTERVAL = 20
+MIN_NORMAL_TICK_INTERVAL = 4
+FAST_TICK_INTERVAL = 2
+
+# the level goes up every 30 seconds of play
+FRAMES_PER_LEVEL = 900
+
+# display frames drawn per second at most; the game still advances FRAME_RATE frames a second whatever this is
+RENDER_RATE = 60
+
+# game frames run back to back to catch up after a slow frame; time lost beyond that is dropped, slowing the game down
+MAX_CATCH_UP_FRAMES = 5
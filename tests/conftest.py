@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the game's modules import each other as top-level modules from src/, the same as when main.py is run
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+import engine
+
+np = pytest.importorskip('numpy')
+import batch_engine
+
+COLORS = 'RGBY'
+
+
+def _random_field(rng: random.Random, rows: int, cols: int) -> list[str]:
+    return [''.join(rng.choice(COLORS + '  ') for _ in range(cols)) for _ in range(rows)]
+
+
+def _assert_same(batch: batch_engine.BatchGameState, games: list[engine.GameState], where: str) -> None:
+    for k, game in enumerate(games):
+        expected = [[(cell.state, cell.jewel) for cell in row] for row in game.board()]
+        actual = [[(cell.state, cell.jewel) for cell in row] for row in batch.board(k)]
+        assert actual == expected, f'board {k} {where}'
+
+        assert batch.total_points()[k] == game.total_points(), f'board {k} {where}'
+        assert batch.current_points()[k] == game.current_points(), f'board {k} {where}'
+        assert batch.has_match()[k] == game.has_match(), f'board {k} {where}'
+        assert batch.game_over()[k] == game.game_over(), f'board {k} {where}'
+        assert batch.has_faller()[k] == (game.faller() is not None), f'board {k} {where}'
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_masked_boards_match_scalar_engine(seed):
+    rng = random.Random(seed)
+    boards = rng.randint(2, 8)
+    rows = rng.randint(4, 10)
+    cols = rng.randint(3, 6)
+
+    batch = batch_engine.BatchGameState(boards, rows, cols)
+    games = [engine.GameState(rows, cols) for _ in range(boards)]
+
+    for k, game in enumerate(games):
+        if rng.random() < 0.5:
+            field = _random_field(rng, rows, cols)
+            game.load(field)
+            batch.load(k, field)
+
+    _assert_same(batch, games, 'after loading')
+
+    for step in range(250):
+        # a random subset of the boards acts each step; boards whose game is over are skipped by the batch
+        mask = np.array([rng.random() < 0.6 for _ in range(boards)])
+        selected = [k for k in range(boards) if mask[k] and not games[k].game_over()]
+
+        action = rng.choice(['tick'] * 6 + ['spawn', 'spawn', 'rotate', 'left', 'right'])
+        where = f'after {action} at step {step}'
+
+        if action == 'tick':
+            batch.tick(mask)
+            for k in selected:
+                games[k].tick()
+            expected_legal = None
+
+        elif action == 'spawn':
+            # columns 0 and cols + 1 are outside the board
+            spawn_cols = [rng.randint(0, cols + 1) for _ in range(boards)]
+            jewels = [[rng.choice(COLORS) for _ in range(3)] for _ in range(boards)]
+
+            legal = batch.spawn_faller(np.array(spawn_cols), batch_engine.jewel_codes(jewels), mask)
+            expected_legal = [k in selected and games[k].try_spawn_faller(engine.Faller(spawn_cols[k], jewels[k]))
+                              for k in range(boards)]
+
+        else:
+            batch_action, game_action = {
+                'rotate': (batch.rotate_faller, engine.GameState.try_rotate_faller),
+                'left': (batch.move_faller_left, engine.GameState.try_move_faller_left),
+                'right': (batch.move_faller_right, engine.GameState.try_move_faller_right)
+            }[action]
+
+            legal = batch_action(mask)
+            expected_legal = [k in selected and game_action(games[k]) for k in range(boards)]
+
+        if expected_legal is not None:
+            assert legal.tolist() == expected_legal, where
+        _assert_same(batch, games, where)
+
+
+def test_game_over_boards_are_left_alone():
+    batch = batch_engine.BatchGameState(3, 4, 3)
+    games = [engine.GameState(4, 3) for _ in range(3)]
+
+    batch.end(np.array([False, True, False]))
+    games[1].end()
+
+    jewels = [['R', 'G', 'B']] * 3
+    legal = batch.spawn_faller(np.array([2, 2, 2]), batch_engine.jewel_codes(jewels))
+    assert legal.tolist() == [True, False, True]
+    for k in (0, 2):
+        games[k].spawn_faller(engine.Faller(2, jewels[k]))
+
+    for _ in range(3):
+        batch.tick()
+        for k in (0, 2):
+            games[k].tick()
+
+    _assert_same(batch, games, 'after ticking')
+    assert not batch.has_faller()[1]
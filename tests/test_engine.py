@@ -0,0 +1,170 @@
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+import engine
+import shell
+
+
+def _engine_memory() -> int:
+    '''Returns the bytes allocated from engine.py that are still alive'''
+    # a full collection also empties the interpreter's free lists, which would otherwise hold on to freed tuples
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, engine.__file__)])
+    return sum(stat.size for stat in snapshot.statistics('filename'))
+
+
+def test_falling_tick_keeps_engine_memory_flat():
+    game = engine.GameState(5000, 6)
+    game.spawn_faller(engine.Faller(3, ['R', 'G', 'B']))
+
+    # the shared Cells and the board view are created while warming up
+    for _ in range(300):
+        game.tick()
+        game.board()[0][0]
+
+    tracemalloc.start()
+    try:
+        # a falling tick replaces the faller's coordinate tuples and the version counter, so the baseline is
+        # taken once the live ones were allocated under tracing too
+        game.tick()
+        before = _engine_memory()
+
+        for _ in range(2000):
+            game.tick()
+        after = _engine_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert game.faller().state() == 1
+    assert after == before
+
+
+def _cells(game: engine.GameState) -> dict:
+    board = game.board()
+    return {(r, c): board[r][c] for r in range(game.rows()) for c in range(game.columns())}
+
+
+def test_change_sets_list_exactly_the_cells_that_differ():
+    rng = random.Random(0)
+
+    for _ in range(200):
+        rows, cols = rng.randint(4, 10), rng.randint(3, 6)
+        game = engine.GameState(rows, cols)
+        game.track_changes()
+
+        before = _cells(game)
+        points = (game.total_points(), game.current_points(), game.has_match())
+
+        if rng.random() < 0.5:
+            game.load([''.join(rng.choice('RGB  ') for _ in range(cols)) for _ in range(rows)])
+
+        for _ in range(150):
+            action = rng.choice(['', '', '', 'F', 'R', '<', '>', 'drop', 'settle'])
+            if action == 'F':
+                game.try_spawn_faller(engine.Faller(rng.randint(1, cols), [rng.choice('RGB') for _ in range(3)]))
+            elif action == 'drop':
+                game.try_hard_drop()
+            elif action == 'settle':
+                game.settle()
+            else:
+                game.apply_actions([action])
+
+            if rng.random() < 0.5:
+                changes = game.take_changes()
+                after = _cells(game)
+
+                assert changes.rows_cols == sorted(cell for cell in after if after[cell] != before[cell])
+                assert changes.points_delta == game.total_points() - points[0]
+                assert changes.current_points_delta == game.current_points() - points[1]
+                assert changes.match_changed == (game.has_match() != points[2])
+
+                before = after
+                points = (game.total_points(), game.current_points(), game.has_match())
+
+            if game.game_over():
+                break
+
+
+@pytest.mark.parametrize('action', ['F', 'F x R G B', 'F 9 R G B', 'F 0 R G B', 'F -1 R G B', 'F 1 RR G B', 'F 1 R G', 'FOO'])
+def test_malformed_or_out_of_range_spawns_are_rejected_without_raising(action):
+    game = engine.GameState(4, 3)
+
+    assert game.apply_actions([action]) == [False]
+    assert game.faller() is None
+    assert not game.game_over()
+
+
+def test_spawn_outside_the_board_is_an_illegal_action():
+    game = engine.GameState(4, 3)
+
+    assert not game.try_spawn_faller(engine.Faller(4, ['R', 'G', 'B']))
+    with pytest.raises(engine.IllegalAction):
+        game.spawn_faller(engine.Faller(0, ['R', 'G', 'B']))
+    assert game.faller() is None
+
+
+def _settle_both_ways(game: engine.GameState) -> tuple[engine.GameState, engine.SettleResult, int]:
+    '''Settles a clone of the game and ticks the game itself through the cascade; returns the clone, the
+    settle() result and the ticks it took'''
+    settled = game.clone()
+    result = settled.settle()
+
+    ticks = 0
+    while game.has_match():
+        game.tick()
+        ticks += 1
+
+    return settled, result, ticks
+
+
+def _assert_settled_the_same(game: engine.GameState, settled: engine.GameState, result: engine.SettleResult,
+                             ticks: int, points: int) -> None:
+    assert _cells(settled) == _cells(game)
+    assert [list(row) for row in result.board] == [list(row) for row in game.board()]
+    assert result.points == game.current_points() - points
+    assert result.depth == ticks
+    assert (settled.current_points(), settled.total_points()) == (game.current_points(), game.total_points())
+    assert settled.game_over() == game.game_over()
+    assert (settled.faller() is None) == (game.faller() is None)
+
+
+def test_settle_matches_ticking_through_a_cascade():
+    game = engine.GameState(4, 3)
+    # clearing the Gs drops the top R onto the two below it, which makes a second match
+    game.load(['R  ', 'GGG', 'RBY', 'RYB'])
+
+    settled, result, ticks = _settle_both_ways(game)
+
+    _assert_settled_the_same(game, settled, result, ticks, 0)
+    assert result.depth == 2
+    assert shell.board_lines(game.board()) == ['|         |', '|         |', '|    B  Y |', '|    Y  B |']
+
+
+def test_settle_matches_ticking_after_fallers_land():
+    rng = random.Random(1)
+    cascades = 0
+
+    for _ in range(300):
+        rows, cols = rng.randint(4, 8), rng.randint(3, 5)
+        game = engine.GameState(rows, cols)
+        game.load([''.join(rng.choice('RGB   ') for _ in range(cols)) for _ in range(rows)])
+        if game.has_match():
+            game.settle()
+
+        # a faller can freeze with jewels still above the board, which settle() has to resolve as well
+        game.try_spawn_faller(engine.Faller(rng.randint(1, cols), [rng.choice('RGB') for _ in range(3)]))
+        while game.faller() is not None and not game.has_match() and not game.game_over():
+            game.tick()
+        if not game.has_match():
+            continue
+
+        points = game.current_points()
+        settled, result, ticks = _settle_both_ways(game)
+
+        _assert_settled_the_same(game, settled, result, ticks, points)
+        cascades += ticks > 1
+
+    assert cascades > 0
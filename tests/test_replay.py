@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+import engine
+import replay
+from session import INPUT_LEFT, INPUT_HARD_DROP
+
+
+def _record_game(seed: int) -> replay.ActionLog:
+    '''Plays a game with random inputs, in the same order as the game loop, and returns its log'''
+    rng = random.Random(seed)
+    session, recorder = replay.new_session(seed=seed)
+    game = session.state()
+
+    while not game.game_over() and session.frame_count() < 20000:
+        if rng.random() < 0.1:
+            try:
+                session.apply_input(rng.randint(INPUT_LEFT, INPUT_HARD_DROP))
+            except engine.IllegalAction:
+                pass
+        session.update()
+
+    return recorder.finish(game.total_points(), session.frame_count(), session.level())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_decoded_log_replays_to_the_recorded_result(seed):
+    log = _record_game(seed)
+    assert log.events and log.fallers
+
+    decoded = replay.decode(replay.encode(log))
+    assert decoded == log
+
+    result = replay.play(decoded)
+    assert (result.score, result.frames, result.level) == (log.score, log.frames, log.level)
+
+
+def test_truncated_or_corrupt_log_is_rejected():
+    data = replay.encode(_record_game(0))
+
+    with pytest.raises(replay.InvalidActionLog):
+        replay.decode(data[:-1])
+    with pytest.raises(replay.InvalidActionLog):
+        replay.decode(b'XXXX' + data[4:])
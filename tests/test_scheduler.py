@@ -0,0 +1,81 @@
+from scheduler import FixedStepScheduler
+
+
+class FakeClock():
+    '''Stands in for time.perf_counter and time.sleep; time only moves when the test or sleep() moves it'''
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock: FakeClock) -> FixedStepScheduler:
+    # intervals that are exact in binary, so the fake times add up without rounding
+    scheduler = FixedStepScheduler(step_rate=4, render_rate=2, max_catch_up=3, clock=clock, sleep=clock.sleep)
+    scheduler.start()
+    return scheduler
+
+
+def test_normal_frames_run_one_step_each_and_render_at_their_own_rate():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+
+    assert scheduler.steps_due() == 0
+    assert scheduler.render_due()
+    assert not scheduler.render_due()
+
+    steps, renders = [], []
+    for _ in range(8):
+        scheduler.wait()
+        steps.append(scheduler.steps_due())
+        renders.append(scheduler.render_due())
+
+    assert clock.slept == [0.25] * 8
+    assert steps == [1] * 8
+    assert renders == [False, True] * 4
+    assert scheduler.dropped_steps() == 0
+
+
+def test_long_frame_catches_up_at_most_max_catch_up_steps_and_resets():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    scheduler.render_due()
+
+    # a frame that takes 2.5 s misses 10 steps and 4 frames
+    clock.now = 2.5
+    assert scheduler.steps_due() == 3
+    assert scheduler.dropped_steps() == 7
+    assert scheduler.steps_due() == 0
+
+    # the missed frames are drawn once, and drawing carries on one interval later
+    assert scheduler.render_due()
+    assert not scheduler.render_due()
+
+    # the schedule restarts from the long frame instead of running the dropped steps later
+    clock.now = 2.7
+    assert scheduler.steps_due() == 0
+    clock.now = 2.75
+    assert scheduler.steps_due() == 1
+    assert not scheduler.render_due()
+    clock.now = 3.0
+    assert scheduler.steps_due() == 1
+    assert scheduler.render_due()
+    assert scheduler.dropped_steps() == 7
+
+
+def test_short_stall_is_made_up_without_dropping_steps():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+
+    clock.now = 0.75
+    assert scheduler.steps_due() == 3
+    assert scheduler.dropped_steps() == 0
+
+    clock.now = 1.0
+    assert scheduler.steps_due() == 1
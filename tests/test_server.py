@@ -0,0 +1,51 @@
+import asyncio
+
+import server
+
+
+async def _session(port: int, text: str) -> bytes:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(text.encode('utf-8'))
+    await writer.drain()
+
+    data = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return data
+
+
+def test_jewels_from_one_session_do_not_break_the_next():
+    async def play() -> tuple[bytes, bytes]:
+        game_server = server.GameServer(idle_timeout=5)
+        listener = await game_server.start_tcp('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        async with listener:
+            # more distinct jewels than the engine has codes for
+            contents = ''.join(chr(0x100 + 3 * r) + chr(0x101 + 3 * r) + chr(0x102 + 3 * r) + '\n' for r in range(100))
+            first = await _session(port, '100\n3\nCONTENTS\n' + contents + 'Q\n')
+            second = await _session(port, '4\n3\nEMPTY\nF 1 R G B\nQ\n')
+        return first, second
+
+    first, second = asyncio.run(play())
+
+    assert first == b'ERROR Jewels must be printable ASCII characters, got \'\xc4\x80\'.\n'
+    assert second.split(b'\n')[5:10] == [
+        b'|[B]      |',
+        b'|         |',
+        b'|         |',
+        b'|         |',
+        b' --------- ',
+    ]
+
+
+def test_non_ascii_contents_are_rejected():
+    async def play() -> bytes:
+        game_server = server.GameServer(idle_timeout=5)
+        listener = await game_server.start_tcp('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        async with listener:
+            return await _session(port, '4\n3\nCONTENTS\n   \n   \n   \né  \nQ\n')
+
+    assert asyncio.run(play()) == b'ERROR Jewels must be printable ASCII characters, got \'\xc3\xa9\'.\n'
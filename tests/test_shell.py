@@ -0,0 +1,21 @@
+import io
+
+import pytest
+
+import shell
+
+
+@pytest.mark.parametrize('text', [
+    '4\n3\nCONTENTS\n   \n   \n   \né  \n\nQ\n',
+    '4\n3\nCONTENTS\n   \n   \nXé \néXY\nF 3 ü R R\n\n\n>\n\nQ\n',
+    '5\n3\nEMPTY\nF 2 R G B\nR\n\n\n<\n\n\n\nF 2 R G B\n\n\n\n\n\nQ\n',
+])
+def test_batch_mode_writes_what_run_game_prints(text, monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO(text))
+    shell.run_game()
+    printed = capsys.readouterr().out.encode('utf-8')
+
+    out = io.BytesIO()
+    shell.run_batch(io.BytesIO(text.encode('utf-8')), out)
+
+    assert out.getvalue() == printed
@@ -0,0 +1,9 @@
+import simulator
+
+
+def test_bot_policy_replays_the_same_game_from_the_same_seed():
+    first = simulator.play_game(7, policy='bot', max_frames=1500)
+    second = simulator.play_game(7, policy='bot', max_frames=1500)
+
+    assert first == second
+    assert first.fallers > 0